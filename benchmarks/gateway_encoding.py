@@ -0,0 +1,98 @@
+"""Compare JSON and ETF gateway decode throughput.
+
+Usage:
+    python benchmarks/gateway_encoding.py [payloads.jsonl] [--rounds N]
+
+The payload file should contain one recorded gateway payload per line, as
+received over a JSON connection. Each payload is re-encoded as ETF with only
+the snowflake fields of known events converted to integers, using the event
+models, so both decoders see equivalent data. If no file is given a synthetic
+MESSAGE_CREATE payload is used.
+"""
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from time import perf_counter
+
+from corded.objects.models import model_for
+from corded.ws import etf
+
+SAMPLE = {
+    "op": 0,
+    "s": 42,
+    "t": "MESSAGE_CREATE",
+    "d": {
+        "id": "881234567890123456",
+        "channel_id": "881234567890123457",
+        "guild_id": "881234567890123458",
+        "content": "Hello, world! " * 8,
+        "author": {
+            "id": "881234567890123459",
+            "username": "corded",
+            "discriminator": "0001",
+            "avatar": None,
+            "bot": False,
+        },
+        "mentions": [],
+        "mention_roles": ["881234567890123460", "881234567890123461"],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "tts": False,
+        "timestamp": "2021-09-01T12:00:00.000000+00:00",
+    },
+}
+
+
+def snowflakes(payload: dict) -> dict:
+    """Convert the snowflakes of a payload the way Discord sends them over ETF."""
+
+    model = model_for(payload.get("t"))
+
+    if model and isinstance(payload.get("d"), dict):
+        payload = {**payload, "d": model(payload["d"]).to_dict()}
+
+    return payload
+
+
+def bench(name: str, decode, payloads: list, rounds: int) -> None:
+    size = sum(len(p) for p in payloads)
+
+    start = perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            decode(payload)
+    elapsed = perf_counter() - start
+
+    count = len(payloads) * rounds
+    print(
+        f"{name:<20} {count / elapsed:>12.0f} payloads/s"
+        f" {size * rounds / elapsed / 2 ** 20:>10.2f} MiB/s"
+        f" (avg {size / len(payloads):.0f} bytes)"
+    )
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payloads", nargs="?", help="A file of newline delimited JSON payloads.")
+    parser.add_argument("--rounds", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.payloads:
+        with open(args.payloads, "rb") as f:
+            json_payloads = [line for line in f.read().splitlines() if line.strip()]
+    else:
+        json_payloads = [dumps(SAMPLE).encode()]
+
+    etf_payloads = [etf.py_dumps(snowflakes(loads(p))) for p in json_payloads]
+    rounds = args.rounds or max(1, 20000 // len(json_payloads))
+
+    bench("json", loads, json_payloads, rounds)
+    bench("json + models", lambda p: snowflakes(loads(p)), json_payloads, rounds)
+    bench("etf (python)", etf.py_loads, etf_payloads, rounds)
+    if etf.erlpack:
+        bench("etf (erlpack)", etf.loads, etf_payloads, rounds)
+
+
+if __name__ == "__main__":
+    main()
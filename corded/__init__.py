@@ -1,4 +1,6 @@
 from .client import CordedClient
+from .cluster import Cluster
+from .codec import JSONCodec
 from .constants import VERSION as __version__
 from .errors import (
     BadRequest,
@@ -13,7 +15,7 @@ from .errors import (
 )
 from .helpers import BitField
 from .http import File, HTTPClient, Route
-from .objects import GatewayEvent, Intents, Object
+from .objects import GatewayEvent, Intents, Model, Object
 from .ws import GatewayClient, Shard
 
 __all__ = (
@@ -31,10 +33,13 @@ __all__ = (
     DiscordServerError,
     Object,
     GatewayEvent,
+    Model,
     GatewayClient,
     Shard,
     CordedClient,
+    Cluster,
     BitField,
     Intents,
+    JSONCodec,
     __version__,
 )
@@ -26,9 +26,10 @@ from asyncio import AbstractEventLoop, get_event_loop
 from inspect import iscoroutinefunction
 from typing import Callable, List, Tuple, Union
 
+from .codec import CodecLike
 from .http import HTTPClient
 from .objects import Intents
-from .ws import GatewayClient
+from .ws import GatewayClient, SessionStore
 
 
 class CordedClient:
@@ -39,6 +40,10 @@ class CordedClient:
         *,
         shard_ids: List[int] = None,
         shard_count: int = None,
+        compress: bool = False,
+        encoding: str = "json",
+        codec: CodecLike = None,
+        session_store: SessionStore = None,
         loop: AbstractEventLoop = None,
     ) -> None:
         """A combined client that can make HTTP requests and connect to the gateway.
@@ -46,6 +51,12 @@ class CordedClient:
         Args:
             token (str): The token to use for API requests and connecting.
             intents (Union[Intents, int]): The intents to use while connecting to the gateway.
+            compress (bool, optional): Whether to use zlib-stream transport compression. Defaults to False.
+            encoding (str, optional): The gateway encoding to use, 'json' or 'etf'. Defaults to 'json'.
+            codec (Union[str, JSONCodec], optional): The JSON codec to use for HTTP and the gateway.
+                Defaults to the fastest installed library.
+            session_store (SessionStore, optional): Where gateway sessions are saved so shards can resume after
+                a restart. Defaults to not saving sessions.
             loop (AbstractEventLoop, optional): The even loop to use. Defaults to asyncio.get_event_loop.
         """
 
@@ -53,15 +64,26 @@ class CordedClient:
         self.token = token
         self.loop = loop or get_event_loop()
 
-        self.http = HTTPClient(token, loop=self.loop)
+        self.http = HTTPClient(token, codec=codec, loop=self.loop)
         self.gateway = GatewayClient(
-            self.http, self.intents, shard_ids, shard_count, loop=self.loop
+            self.http,
+            self.intents,
+            shard_ids,
+            shard_count,
+            compress=compress,
+            encoding=encoding,
+            session_store=session_store,
+            loop=self.loop,
         )
 
     def start(self) -> None:
         """Make a blocking call to start the Gateway connection."""
 
-        self.loop.run_until_complete(self.gateway.start())
+        try:
+            self.loop.run_until_complete(self.gateway.start())
+        finally:
+            # Sessions are saved on the way out, so the next start can resume them
+            self.loop.run_until_complete(self.gateway.close())
 
     def add_listener(
         self, events: Union[List[str], Tuple[List[str], ...]], callback: Callable
@@ -75,7 +97,7 @@ class CordedClient:
         if not events:
             events = [callback.__name__]
         for event in events:
-            self.gateway.listeners[event].append(callback)
+            self.gateway.add_listener(event, callback)
 
     def on(self, *events: str) -> Callable:
         def wrapper(func):
@@ -85,5 +107,5 @@ class CordedClient:
         return wrapper
 
     def middleware(self, func) -> Callable:
-        self.gateway.dispatch_middleware.append(func)
+        self.gateway.add_middleware(func)
         return func
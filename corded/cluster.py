@@ -0,0 +1,241 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, new_event_loop, set_event_loop, sleep
+from dataclasses import dataclass
+from logging import getLogger
+from multiprocessing import get_context
+from multiprocessing.process import BaseProcess
+from time import sleep as block
+from time import time
+from typing import Callable, Dict, List, Union
+
+from .helpers import shard_for_guild
+from .http import HTTPClient
+from .ws.ratelimiter import IDENTIFY_INTERVAL
+
+log = getLogger(__name__)
+
+
+def cluster_for_shard(shard_id: int, shard_count: int, clusters: int) -> int:
+    """Get the index of the cluster which runs a shard.
+
+    Args:
+        shard_id (int): The ID of the shard.
+        shard_count (int): The total number of shards.
+        clusters (int): The number of clusters.
+    """
+
+    return ((shard_id + 1) * clusters - 1) // shard_count
+
+
+def shards_for_cluster(cluster: int, shard_count: int, clusters: int) -> List[int]:
+    """Get the IDs of the shards run by a cluster.
+
+    Shards are split as evenly as possible, so no cluster is left empty while there are at least as many shards as
+    clusters.
+
+    Args:
+        cluster (int): The index of the cluster.
+        shard_count (int): The total number of shards.
+        clusters (int): The number of clusters.
+    """
+
+    return list(range(cluster * shard_count // clusters, (cluster + 1) * shard_count // clusters))
+
+
+@dataclass
+class ClusterInfo:
+    id: int
+    clusters: int
+    shard_ids: List[int]
+    shard_count: int
+
+    def cluster_for_guild(self, guild_id: Union[int, str]) -> int:
+        """Get the index of the cluster which receives events for a guild."""
+
+        return cluster_for_shard(shard_for_guild(guild_id, self.shard_count), self.shard_count, self.clusters)
+
+
+class ClusterIdentifyLimiter:
+    def __init__(self, lock, slots) -> None:
+        """An identify limiter shared between cluster processes.
+
+        Each identify bucket (shard_id % max_concurrency) stores the earliest time its next identify may
+        happen, so at most one shard per bucket identifies every 5 seconds across all processes.
+
+        Args:
+            lock: A multiprocessing lock guarding slots.
+            slots: A shared multiprocessing array with one timestamp per identify bucket.
+        """
+
+        self.lock = lock
+        self.slots = slots
+
+    async def acquire(self, shard_id: int) -> None:
+        """Wait until a shard is allowed to identify.
+
+        Args:
+            shard_id (int): The ID of the shard which is about to identify.
+        """
+
+        bucket = shard_id % len(self.slots)
+
+        # The lock is only held long enough to reserve a slot, so it's fine to block on it briefly
+        with self.lock:
+            now = time()
+            at = max(now, self.slots[bucket])
+            self.slots[bucket] = at + IDENTIFY_INTERVAL
+
+        if at > now:
+            await sleep(at - now)
+
+
+def run_worker(factory: Callable, info: ClusterInfo, lock, slots) -> None:
+    loop = new_event_loop()
+    set_event_loop(loop)
+
+    client = factory(info.shard_ids, info.shard_count)
+    client.gateway.cluster = info
+    client.gateway.identify_limiter = ClusterIdentifyLimiter(lock, slots)
+
+    client.start()
+
+
+class Cluster:
+    def __init__(
+        self,
+        factory: Callable,
+        clusters: int,
+        *,
+        token: str = None,
+        shard_count: int = None,
+        max_concurrency: int = None,
+        restart_delay: float = 5,
+    ) -> None:
+        """A launcher which runs shards across several worker processes and supervises them.
+
+        The factory is called in each worker with (shard_ids, shard_count) and must return a CordedClient.
+        It is sent to the workers by pickling, so it has to be a module level function.
+
+        Args:
+            factory (Callable): A function which creates the client for a worker.
+            clusters (int): The number of worker processes to run.
+            token (str, optional): A token used to fetch the shard count and max concurrency if they aren't given.
+            shard_count (int, optional): The total number of shards. Defaults to the recommended shard count.
+            max_concurrency (int, optional): The identify concurrency. Defaults to the value from /gateway/bot, or 1.
+            restart_delay (float, optional): How long to wait before restarting a dead worker. Defaults to 5.
+        """
+
+        if (shard_count is None or max_concurrency is None) and token:
+            loop = new_event_loop()
+            try:
+                gateway = loop.run_until_complete(self.fetch_gateway(token, loop))
+            finally:
+                loop.close()
+            shard_count = shard_count or gateway.shards
+            max_concurrency = max_concurrency or gateway.session_start_limit.max_concurrency
+
+        if shard_count is None:
+            raise ValueError("shard_count must be given if no token is provided")
+
+        self.factory = factory
+        self.clusters = min(clusters, shard_count)
+        self.shard_count = shard_count
+        self.max_concurrency = max_concurrency or 1
+        self.restart_delay = restart_delay
+
+        self.infos = [
+            ClusterInfo(i, self.clusters, shards_for_cluster(i, shard_count, self.clusters), shard_count)
+            for i in range(self.clusters)
+        ]
+
+        self.context = get_context("spawn")
+        self.lock = self.context.Lock()
+        self.slots = self.context.Array("d", self.max_concurrency, lock=False)
+
+        self.processes: Dict[int, BaseProcess] = {}
+        self.restarts: Dict[int, int] = {info.id: 0 for info in self.infos}
+
+    @staticmethod
+    async def fetch_gateway(token: str, loop: AbstractEventLoop):
+        http = HTTPClient(token, loop=loop)
+        try:
+            return await http.get_gateway_bot()
+        finally:
+            await http.close()
+
+    def cluster_for_guild(self, guild_id: Union[int, str]) -> int:
+        """Get the index of the cluster which receives events for a guild.
+
+        Args:
+            guild_id (Union[int, str]): The ID of the guild.
+        """
+
+        return cluster_for_shard(shard_for_guild(guild_id, self.shard_count), self.shard_count, self.clusters)
+
+    def spawn(self, info: ClusterInfo) -> None:
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.factory, info, self.lock, self.slots),
+            name=f"corded-cluster-{info.id}",
+            daemon=True,
+        )
+        process.start()
+
+        self.processes[info.id] = process
+
+    def run(self) -> None:
+        """Start every worker and block, restarting workers that exit."""
+
+        for info in self.infos:
+            self.spawn(info)
+
+        try:
+            while True:
+                block(1)
+
+                for info in self.infos:
+                    process = self.processes[info.id]
+                    if process.is_alive():
+                        continue
+
+                    log.warning("Cluster %d exited with code %s, restarting", info.id, process.exitcode)
+                    self.restarts[info.id] += 1
+
+                    block(self.restart_delay)
+                    self.spawn(info)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Terminate every worker."""
+
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        for process in self.processes.values():
+            process.join()
@@ -0,0 +1,124 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from json import JSONDecodeError
+from json import dumps as json_dumps
+from json import loads as json_loads
+from typing import Any, Optional, Tuple, Type, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JSONCodec:
+    """The stdlib JSON codec, used when no faster library is installed."""
+
+    name: str = "json"
+    errors: Tuple[Type[Exception], ...] = (JSONDecodeError, UnicodeDecodeError)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a JSON document.
+
+        Args:
+            data (Union[str, bytes]): The document to decode.
+        """
+
+        return json_loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as a JSON document.
+
+        Args:
+            obj (Any): The object to encode.
+        """
+
+        return json_dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__qualname__} name={self.name!r}>"
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if not orjson:
+            raise RuntimeError("orjson is not installed")
+
+        self.errors = (orjson.JSONDecodeError,)
+        self.loads = orjson.loads
+        self.dumps = orjson.dumps
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        if not msgspec:
+            raise RuntimeError("msgspec is not installed")
+
+        self.errors = (msgspec.DecodeError,)
+        self.loads = msgspec.json.Decoder().decode
+        self.dumps = msgspec.json.Encoder().encode
+
+
+CODECS = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+CodecLike = Optional[Union[str, JSONCodec]]
+
+
+def get_codec(codec: CodecLike = None) -> JSONCodec:
+    """Resolve a codec setting into a codec instance.
+
+    Args:
+        codec (Union[str, JSONCodec], optional): A codec instance, one of 'json', 'orjson', 'msgspec',
+            or 'auto' to pick the fastest installed library. Defaults to 'auto'.
+    """
+
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is None or codec == "auto":
+        if orjson:
+            return OrjsonCodec()
+        if msgspec:
+            return MsgspecCodec()
+        return JSONCodec()
+
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of 'auto', {', '.join(repr(c) for c in CODECS)}")
+
+    return CODECS[codec]()
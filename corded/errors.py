@@ -1,4 +1,4 @@
-from aiohttp import ClientResponse
+from typing import Any, Mapping
 
 
 class CordedError(Exception):
@@ -9,8 +9,36 @@ class CordedError(Exception):
 
 
 class HTTPError(CordedError):
-    def __init__(self, response: ClientResponse) -> None:
-        self.response = response
+    def __init__(
+        self,
+        status: int = None,
+        data: Any = None,
+        headers: Mapping[str, str] = None,
+        *,
+        body: bytes = b"",
+        message: str = None,
+    ) -> None:
+        """An error response from the API.
+
+        The response has already been read and released by the time this is raised.
+
+        Args:
+            status (int, optional): The response status.
+            data (Any, optional): The parsed JSON error body, or the body text if it wasn't JSON.
+            headers (Mapping[str, str], optional): The response headers.
+            body (bytes, optional): The raw response body.
+            message (str, optional): The error message. Defaults to the message in the error body.
+        """
+
+        if message is None and isinstance(data, dict):
+            message = data.get("message")
+
+        super().__init__(f"{status}: {message}" if status and message else message or status)
+        self.status = status
+        self.data = data
+        self.headers = headers or {}
+        self.body = body
+        self.code = data.get("code") if isinstance(data, dict) else None
 
 
 class BadRequest(HTTPError):
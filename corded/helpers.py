@@ -23,7 +23,7 @@ SOFTWARE.
 """
 
 from re import compile
-from typing import Union
+from typing import Any, Iterator, Mapping, Sequence, Union
 
 INT = compile(r"^\d+$")
 
@@ -41,6 +41,111 @@ def int_types(data: Types) -> Types:
         return [int_types(v) for v in data]
 
 
+def shard_for_guild(guild_id: Union[int, str], shard_count: int) -> int:
+    """Get the ID of the shard which receives events for a guild.
+
+    Args:
+        guild_id (Union[int, str]): The ID of the guild.
+        shard_count (int): The total number of shards.
+    """
+
+    return (int(guild_id) >> 22) % shard_count
+
+
+class LazyTypedDict(Mapping):
+    __slots__ = ("raw", "cache")
+
+    def __init__(self, raw: dict) -> None:
+        """A read-only view of a dict that applies int_types to values as they are accessed.
+
+        Converted values are memoized, nested containers are wrapped in lazy views.
+
+        Args:
+            raw (dict): The raw data to wrap.
+        """
+
+        self.raw = raw
+        self.cache = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            return self.cache[key]
+        except KeyError:
+            value = self.cache[key] = lazy_types(self.raw[key])
+            return value
+
+    def __iter__(self) -> Iterator:
+        return iter(self.raw)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__qualname__} keys={len(self.raw)}>"
+
+    def to_dict(self) -> dict:
+        """Fully convert the view into a plain dict."""
+
+        return int_types(self.raw)
+
+
+class LazyTypedList(Sequence):
+    __slots__ = ("raw", "cache")
+
+    def __init__(self, raw: list) -> None:
+        """A read-only view of a list that applies int_types to items as they are accessed.
+
+        Args:
+            raw (list): The raw data to wrap.
+        """
+
+        self.raw = raw
+        self.cache = [_MISSING] * len(raw)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.raw)))]
+
+        value = self.cache[index]
+        if value is _MISSING:
+            value = self.cache[index] = lazy_types(self.raw[index])
+        return value
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__qualname__} length={len(self.raw)}>"
+
+    def __eq__(self, other: Any) -> bool:
+        # Compares like the list int_types would have returned, so lists and other views are equal item by item
+        if not isinstance(other, (list, LazyTypedList)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def to_list(self) -> list:
+        """Fully convert the view into a plain list."""
+
+        return int_types(self.raw)
+
+
+_MISSING = object()
+
+
+def lazy_types(data: Types) -> Any:
+    """Like int_types, but containers are wrapped in views that convert on access."""
+
+    if isinstance(data, dict):
+        return LazyTypedDict(data)
+    if isinstance(data, list):
+        return LazyTypedList(data)
+    if isinstance(data, str) and INT.match(data):
+        return int(data)
+    return data
+
+
 class BitField:
     def __init__(self, value: int) -> None:
         self.value = value
@@ -1,9 +1,20 @@
+from .batch import Batch, BatchResult
 from .client import HTTPClient
+from .connector import ConnectorConfig
 from .file import File
+from .proxy import RatelimitProxy
+from .ratelimiter import Priority
 from .route import Route
+from .stream import StreamedResponse
 
 __all__ = (
+    Batch,
+    BatchResult,
+    ConnectorConfig,
     File,
     HTTPClient,
+    Priority,
+    RatelimitProxy,
     Route,
+    StreamedResponse,
 )
@@ -0,0 +1,182 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+from asyncio import AbstractEventLoop, CancelledError, Queue, Semaphore, gather, get_event_loop
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Optional, TYPE_CHECKING, Tuple
+
+from .route import Route
+
+if TYPE_CHECKING:
+    from .client import HTTPClient
+
+BatchItem = Tuple[str, Route, Dict[str, Any]]
+
+
+@dataclass
+class BatchResult:
+    index: int
+    method: str
+    route: Route
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Batch:
+    def __init__(
+        self,
+        http: HTTPClient,
+        items: Iterable[BatchItem],
+        *,
+        concurrency: int = 50,
+        max_pending: int = 1000,
+        return_exceptions: bool = True,
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """Run many requests, in parallel across ratelimit buckets and in order within each bucket.
+
+        Items are pulled from the iterable lazily, so at most max_pending requests are queued, running or
+        waiting to be yielded at once, however many items there are. Results are yielded as they complete.
+
+        Args:
+            http (HTTPClient): The client to make the requests with.
+            items (Iterable[Tuple[str, Route, Dict[str, Any]]]): (method, route, params) for each request, where
+                params are the keyword arguments to HTTPClient.request.
+            concurrency (int, optional): How many buckets are worked on at once. Defaults to 50.
+            max_pending (int, optional): How many items can be taken from the iterable and not yet yielded.
+                Defaults to 1000.
+            return_exceptions (bool, optional): Whether failed requests are yielded with their error set, rather
+                than raising and stopping the batch. Defaults to True.
+        """
+
+        self.http = http
+        self.items = items
+        self.concurrency = concurrency
+        self.return_exceptions = return_exceptions
+        self.loop = loop or get_event_loop()
+
+        self.lanes: Dict[str, Deque[Tuple[int, BatchItem]]] = {}
+        self.ready: Queue = Queue()
+        self.results: Queue = Queue()
+        self.pending = Semaphore(max_pending)
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def bucket_for(self, method: str, route: Route) -> str:
+        return self.http.ratelimiter.get_bucket(method.upper(), route)
+
+    async def feed(self) -> None:
+        try:
+            items = enumerate(self.items)
+
+            while True:
+                # Wait for room before taking the next item, so no more than max_pending are ever taken
+                await self.pending.acquire()
+
+                item = next(items, None)
+                if item is None:
+                    break
+
+                index, (method, route, params) = item
+                key = self.bucket_for(method, route)
+                self.submitted += 1
+
+                if key in self.lanes:
+                    self.lanes[key].append((index, (method, route, params)))
+                else:
+                    self.lanes[key] = deque([(index, (method, route, params))])
+                    self.ready.put_nowait(key)
+        finally:
+            self.results.put_nowait(None)
+
+    async def work(self) -> None:
+        while True:
+            key = await self.ready.get()
+            lane = self.lanes[key]
+
+            # A lane is only ever worked on by one worker, which keeps requests in the same bucket in order
+            while lane:
+                index, (method, route, params) = lane.popleft()
+                result = BatchResult(index, method, route)
+
+                try:
+                    result.result = await self.http.request(method, route, **params)
+                except CancelledError:
+                    raise
+                except Exception as e:
+                    result.error = e
+
+                self.results.put_nowait(result)
+
+            del self.lanes[key]
+
+    async def __aiter__(self) -> AsyncIterator[BatchResult]:
+        tasks = [self.loop.create_task(self.feed())]
+        tasks.extend(self.loop.create_task(self.work()) for _ in range(self.concurrency))
+
+        fed = False
+        try:
+            while not fed or self.completed + self.failed < self.submitted:
+                result = await self.results.get()
+
+                if result is None:
+                    fed = True
+                    continue
+
+                self.pending.release()
+
+                if result.ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                    if not self.return_exceptions:
+                        raise result.error
+
+                yield result
+
+            # Surface any error from iterating the items
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "buckets": len(self.lanes),
+        }
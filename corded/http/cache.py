@@ -0,0 +1,179 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, CancelledError, Task, current_task, get_event_loop, shield
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .route import Route
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttls: Dict[str, float] = None,
+        *,
+        max_size: int = 1024,
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """Coalesces identical in-flight GET requests and optionally caches their results.
+
+        The upstream request runs in its own task, so a caller being cancelled doesn't affect the others, and it's
+        only cancelled once every caller waiting on it has been. Callers get their own copy of a result when it's
+        shared with other callers or the cache.
+
+        Args:
+            ttls (Dict[str, float], optional): Route templates mapped to how long their responses are cached for
+                in seconds, e.g. {"/guilds/{guild_id}": 30}. Defaults to caching nothing.
+            max_size (int, optional): The maximum number of cached responses. Defaults to 1024.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.ttls = ttls or {}
+        self.max_size = max_size
+        self.loop = loop or get_event_loop()
+
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.in_flight: Dict[Hashable, Task] = {}
+        self.waiters: Dict[Task, List[int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+
+        if self.loop.time() >= expires_at:
+            del self.entries[key]
+            return False, None
+
+        self.entries.move_to_end(key)
+        return True, value
+
+    def store(self, key: Hashable, value: Any, ttl: float) -> None:
+        self.entries[key] = (self.loop.time() + ttl, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def fetch(self, key: Hashable, route: Route, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a response from the cache, join an identical in-flight request, or make the request.
+
+        Args:
+            key (Hashable): The key identifying the request.
+            route (Route): The route of the request, used to look up its TTL.
+            factory (Callable): A function which makes the request.
+        """
+
+        ttl = self.ttls.get(route.path)
+
+        if ttl:
+            found, value = self.lookup(key)
+            if found:
+                self.hits += 1
+                return deepcopy(value)
+
+        if task := self.in_flight.get(key):
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self.in_flight[key] = self.loop.create_task(self.request(key, ttl, factory))
+            task.add_done_callback(self.retrieve)
+            self.waiters[task] = [0, 0]
+
+        # [callers who joined, callers still waiting]
+        waiters = self.waiters[task]
+        waiters[0] += 1
+        waiters[1] += 1
+
+        try:
+            value = await shield(task)
+        except CancelledError:
+            # The request is only abandoned once nobody is waiting for it
+            if not task.done() and waiters[1] == 1:
+                task.cancel()
+                # Later callers start a new request rather than joining the cancelled one
+                if self.in_flight.get(key) is task:
+                    del self.in_flight[key]
+            raise
+        finally:
+            waiters[1] -= 1
+            if not waiters[1]:
+                del self.waiters[task]
+
+        return deepcopy(value) if waiters[0] > 1 else value
+
+    async def request(self, key: Hashable, ttl: Optional[float], factory: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await factory()
+        finally:
+            if self.in_flight.get(key) is current_task():
+                del self.in_flight[key]
+
+        if ttl:
+            self.store(key, deepcopy(value), ttl)
+
+        return value
+
+    @staticmethod
+    def retrieve(task: Task) -> None:
+        # Marks the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate(self, route: Optional[Route] = None) -> None:
+        """Remove cached responses.
+
+        Args:
+            route (Route, optional): Only remove responses for this route. Defaults to removing everything.
+        """
+
+        if route is None:
+            self.entries.clear()
+            return
+
+        for key in [key for key in self.entries if key[0] == route.route]:
+            del self.entries[key]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "in_flight": len(self.in_flight),
+        }
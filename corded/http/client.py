@@ -22,13 +22,14 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from asyncio import AbstractEventLoop, get_event_loop, sleep
-from json import JSONDecodeError
-from typing import Any, Literal
+from asyncio import AbstractEventLoop, gather, get_event_loop, sleep
+from logging import getLogger
+from typing import Any, Dict, Iterable, Literal, Optional
 
 from aiohttp import ClientResponse, ClientSession, FormData
 
 import corded.objects.partials as p
+from corded.codec import CodecLike, JSONCodec, get_codec
 from corded.constants import API_URL, VERSION
 from corded.errors import (
     BadRequest,
@@ -41,27 +42,68 @@ from corded.errors import (
     Unauthorized,
 )
 
+from .batch import Batch, BatchItem
+from .cache import ResponseCache
+from .connector import ConnectorConfig, PoolStats
 from .file import File
-from .ratelimiter import Ratelimiter
+from .ratelimiter import Priority, Ratelimiter
 from .route import Route
+from .stream import StreamedResponse
 
-ResponseFormat = Literal["raw", "text", "json", "auto", "response"]
+log = getLogger(__name__)
+
+ResponseFormat = Literal["raw", "text", "json", "auto", "response", "stream"]
+
+CACHEABLE_FORMATS = frozenset(("raw", "text", "json", "auto"))
 
 
 class HTTPClient:
     def __init__(
-        self, token: str, *, url: str = None, loop: AbstractEventLoop = None
+        self,
+        token: str,
+        *,
+        url: str = None,
+        proxy: str = None,
+        codec: CodecLike = None,
+        global_rate: Optional[float] = 50,
+        attempts: int = None,
+        interaction_rate: Optional[float] = None,
+        cache_ttls: Dict[str, float] = None,
+        cache_size: int = 1024,
+        max_upload_size: Optional[int] = None,
+        connector: ConnectorConfig = None,
+        loop: AbstractEventLoop = None,
     ) -> None:
         """An HTTP client to make Discord API requests, observing ratelimits.
 
         Args:
             token (str): The bot token to make requests with.
             url (str, optional): The URL of the Discord API. Defaults to corded.constants.API_URL.
+            proxy (str, optional): The URL of a corded ratelimit proxy to send every request through instead. The
+                proxy owns the global limit and retries, so the client doesn't apply global_rate and makes a single
+                attempt by default. Per-route buckets are still tracked from the headers the proxy forwards.
+            codec (Union[str, JSONCodec], optional): The JSON codec to use. Defaults to the fastest installed.
+            global_rate (float, optional): Requests per second to allow before the global limit. Defaults to 50,
+                ignored when using a proxy.
+            attempts (int, optional): How many attempts requests make before giving up, unless they pass their own.
+                Defaults to 3, or 1 when using a proxy.
+            interaction_rate (float, optional): Requests per second for interaction endpoints. Defaults to unlimited.
+            cache_ttls (Dict[str, float], optional): Route templates mapped to how long GET responses for them
+                are cached in seconds. Defaults to caching nothing, identical in-flight GETs are always coalesced.
+            cache_size (int, optional): The maximum number of cached responses. Defaults to 1024.
+            max_upload_size (int, optional): The largest total file size to upload, larger uploads raise
+                PayloadTooLarge before anything is sent. The limit depends on the guild, so this is opt-in.
+                Defaults to None, which disables the check.
+            connector (ConnectorConfig, optional): Connection pool settings. Defaults to ConnectorConfig().
             loop (AbstractEventLoop, optional): The event loop to use. Defaults to asyncio.get_event_loop().
         """
 
         self.token = token
-        self.url = url or API_URL
+        self.max_upload_size = max_upload_size
+        self.url = (proxy and proxy.rstrip("/")) or url or API_URL
+        self.proxy = proxy
+        self.attempts = attempts or (1 if proxy else 3)
+        self.codec = get_codec(codec)
         self.loop = loop or get_event_loop()
 
         self.headers = {
@@ -70,7 +112,12 @@ class HTTPClient:
             "X-RateLimit-Precision": "millisecond",
         }
 
-        self.ratelimiter = Ratelimiter(self.loop)
+        self.ratelimiter = Ratelimiter(
+            self.loop, global_rate=None if proxy else global_rate, interaction_rate=interaction_rate
+        )
+        self.cache = ResponseCache(cache_ttls, max_size=cache_size, loop=self.loop)
+        self.connector = connector or ConnectorConfig()
+        self.pool_stats = PoolStats()
         self.session: ClientSession = None
 
         self.errors = {
@@ -84,44 +131,77 @@ class HTTPClient:
 
     @staticmethod
     async def response_as(
-        response: ClientResponse, format: ResponseFormat = "json"
+        response: ClientResponse, format: ResponseFormat = "json", codec: JSONCodec = None
     ) -> Any:
         """Return a ClientResponse in a given format.
 
         Args:
             response (ClientResponse): The client response to get data from.
-            format (str, optional): The format to use. Defaults to 'json', must be one of 'json', 'text', 'auto', 'raw'.
+            format (str, optional): The format to use. Defaults to 'json', must be one of 'json', 'text', 'auto', 'raw',
+                'response' or 'stream'.
+            codec (JSONCodec, optional): The codec to decode JSON with. Defaults to the stdlib codec.
         """
 
+        codec = codec or JSONCodec()
+
         if format == "raw":
             return await response.read()
         if format == "json":
-            return await response.json()
+            body = await response.read()
+            return codec.loads(body) if body.strip() else None
         if format == "text":
             return await response.text()
         if format == "auto":
+            body = await response.read()
             try:
-                return await response.json()
-            except JSONDecodeError:
+                return codec.loads(body)
+            except codec.errors:
                 return await response.text()
         if format == "response":
             return response
-        raise ValueError("Format must be one of 'json', 'text', 'auto', 'raw'")
+        if format == "stream":
+            return StreamedResponse(response)
+        raise ValueError("Format must be one of 'json', 'text', 'auto', 'raw', 'response', 'stream'")
+
+    async def read_error(self, response: ClientResponse) -> HTTPError:
+        """Read and release an error response, and build the matching exception for it.
+
+        Args:
+            response (ClientResponse): The error response.
+        """
+
+        try:
+            body = await response.read()
+        finally:
+            response.release()
+
+        try:
+            data = self.codec.loads(body) if body.strip() else None
+        except self.codec.errors:
+            data = body.decode(errors="replace")
+
+        status = response.status
+        if status >= 500:
+            error = DiscordServerError
+        else:
+            error = self.errors.get(status, self.errors["_"])
+
+        return error(status, data, response.headers, body=body)
 
     async def get(self, route: Route, *, attempts: int = None, expect: ResponseFormat = "json", **params) -> Any:
-        await self.request("GET", route, attempts=attempts, expect=expect, **params)
+        return await self.request("GET", route, attempts=attempts, expect=expect, **params)
 
     async def post(self, route: Route, *, attempts: int = None, expect: ResponseFormat = "json", **params) -> Any:
-        await self.request("POST", route, attempts=attempts, expect=expect, **params)
+        return await self.request("POST", route, attempts=attempts, expect=expect, **params)
 
     async def put(self, route: Route, *, attempts: int = None, expect: ResponseFormat = "json", **params) -> Any:
-        await self.request("PUT", route, attempts=attempts, expect=expect, **params)
+        return await self.request("PUT", route, attempts=attempts, expect=expect, **params)
 
     async def patch(self, route: Route, *, attempts: int = None, expect: ResponseFormat = "json", **params) -> Any:
-        await self.request("PATCH", route, attempts=attempts, expect=expect, **params)
+        return await self.request("PATCH", route, attempts=attempts, expect=expect, **params)
 
     async def delete(self, route: Route, *, attempts: int = None, expect: ResponseFormat = "json", **params) -> Any:
-        await self.request("DELETE", route, attempts=attempts, expect=expect, **params)
+        return await self.request("DELETE", route, attempts=attempts, expect=expect, **params)
 
     async def request(
         self,
@@ -130,6 +210,7 @@ class HTTPClient:
         *,
         attempts: int = None,
         expect: ResponseFormat = "json",
+        priority: int = Priority.NORMAL,
         **params,
     ) -> Any:
         """Make a Discord API request.
@@ -137,107 +218,303 @@ class HTTPClient:
         Args:
             method (str): The HTTP method to use.
             route (Route): The Route to use for the request.
-            attempts (int, optional): How many attempts to make before giving up. Defaults to 3.
+            attempts (int, optional): How many attempts to make before giving up. Defaults to HTTPClient.attempts.
             expect (str, optional): What format to expect the result in. Defaults to JSON.
+            priority (int, optional): The request's priority when ratelimit capacity is limited, higher is
+                admitted first. Defaults to Priority.NORMAL.
         """
 
-        attempts = attempts or 3
+        method = method.upper()
 
-        if not self.session or self.session.closed:
-            self.session = ClientSession(headers=self.headers)
+        # Identical GETs share one upstream request, and may be served from the cache
+        if method == "GET" and expect in CACHEABLE_FORMATS and params.keys() <= {"params"}:
+            query = params.get("params")
+            key = (route.route, expect, tuple(sorted((str(k), str(v)) for k, v in dict(query or {}).items())))
 
-        bucket = route.bucket
+            return await self.cache.fetch(
+                key,
+                route,
+                lambda: self.send_request(
+                    method, route, attempts=attempts, expect=expect, priority=priority, **params
+                ),
+            )
 
-        request_headers = {}
-        if "reason" in params:
-            request_headers["X-Audit-Log-Reason"] = params.pop("reason")
+        return await self.send_request(
+            method, route, attempts=attempts, expect=expect, priority=priority, **params
+        )
 
-        for i in range(attempts):
-            if files := params.pop("files", []):
-                if i:
-                    for file in files:
-                        file.seek(0)
-                formdata = FormData()
+    def batch(
+        self,
+        items: Iterable[BatchItem],
+        *,
+        concurrency: int = 50,
+        max_pending: int = 1000,
+        return_exceptions: bool = True,
+    ) -> Batch:
+        """Make many requests, in parallel across ratelimit buckets and in order within each bucket.
 
-                for fn, file in enumerate(files):
-                    if not isinstance(file, File):
-                        raise TypeError(
-                            f"files must be a list of corded.File, not {file.__class__.__qualname__}"
-                        )
-                    # TODO: use the file name and check for dupes
-                    formdata.add_field(f"file_{fn}", file.file, filename=file.filename)
+        Usage:
+            async for result in http.batch(("PUT", route, {}) for route in routes):
+                ...
 
-                for k, v in params.pop("json", {}).items():
-                    formdata.add_field(k, v)
+        Args:
+            items (Iterable[Tuple[str, Route, Dict[str, Any]]]): (method, route, params) for each request.
+            concurrency (int, optional): How many buckets are worked on at once. Defaults to 50.
+            max_pending (int, optional): How many requests can be in progress or waiting to be yielded.
+                Defaults to 1000.
+            return_exceptions (bool, optional): Whether failed requests are yielded with their error set, rather
+                than raising and stopping the batch. Defaults to True.
+        """
 
-                params["data"] = formdata
+        return Batch(
+            self,
+            items,
+            concurrency=concurrency,
+            max_pending=max_pending,
+            return_exceptions=return_exceptions,
+            loop=self.loop,
+        )
 
-            await self.ratelimiter.acquire(bucket)
+    def map(
+        self,
+        method: str,
+        routes: Iterable[Route],
+        *,
+        concurrency: int = 50,
+        max_pending: int = 1000,
+        return_exceptions: bool = True,
+        **params,
+    ) -> Batch:
+        """Make the same request to many routes, see HTTPClient.batch.
 
-            response = await self.session.request(
-                method, self.url + route.route, headers=request_headers, **params
-            )
+        Args:
+            method (str): The HTTP method to use.
+            routes (Iterable[Route]): The routes to make the request to.
+            concurrency (int, optional): How many buckets are worked on at once. Defaults to 50.
+            max_pending (int, optional): How many requests can be in progress or waiting to be yielded.
+                Defaults to 1000.
+            return_exceptions (bool, optional): Whether failed requests are yielded with their error set, rather
+                than raising and stopping the batch. Defaults to True.
+            params: Keyword arguments to HTTPClient.request, shared by every request.
+        """
 
-            status = response.status
-            headers = response.headers
+        return self.batch(
+            ((method, route, params) for route in routes),
+            concurrency=concurrency,
+            max_pending=max_pending,
+            return_exceptions=return_exceptions,
+        )
 
-            rl_reset_after = float(headers.get("X-RateLimit-Reset-After", 0))
+    async def send_request(
+        self,
+        method: str,
+        route: Route,
+        *,
+        attempts: int = None,
+        expect: ResponseFormat = "json",
+        priority: int = Priority.NORMAL,
+        **params,
+    ) -> Any:
+        """Make a Discord API request without coalescing or caching.
 
-            # Default here is for non authenticated (and hence non ratelimited) endpoints
-            rl_bucket_remaining = int(headers.get("X-RateLimit-Remaining", 1))
-            rl_sleep_for = 0
+        Args:
+            method (str): The HTTP method to use.
+            route (Route): The Route to use for the request.
+            attempts (int, optional): How many attempts to make before giving up. Defaults to HTTPClient.attempts.
+            expect (str, optional): What format to expect the result in. Defaults to JSON.
+            priority (int, optional): The request's priority when ratelimit capacity is limited. Defaults to NORMAL.
+        """
 
-            if status != 429 and rl_bucket_remaining == 0:
-                rl_sleep_for = rl_reset_after
+        attempts = attempts or self.attempts
 
-            if 200 <= status < 300:
-                self.ratelimiter.release(bucket, rl_sleep_for)
-                return await self.response_as(response, expect)
+        if not self.session or self.session.closed:
+            self.create_session()
 
-            if status == 429:
-                if not headers.get("Via"):
-                    raise TooManyRequests(429, response, "Ratelimited by cloudflare.")
+        request_headers = {}
+        if "reason" in params:
+            request_headers["X-Audit-Log-Reason"] = params.pop("reason")
 
-                data = await self.response_as(response, "json")
-                is_global = data.get("global", False)
-                rl_sleep_for = data.get("retry_after")
+        if "headers" in params:
+            request_headers.update(params.pop("headers"))
 
-                if is_global:
-                    self.ratelimiter.lock_globally(rl_sleep_for)
+        files = params.pop("files", None)
+        payload = params.pop("json", None) if files else None
 
-            elif status >= 500:
-                rl_sleep_for = 1 + i * 2
+        if files:
+            for file in files:
+                if not isinstance(file, File):
+                    raise TypeError(f"files must be a list of corded.File, not {file.__class__.__qualname__}")
 
-            else:
-                self.ratelimiter.release(bucket, rl_sleep_for)
-                raise self.errors.get(status, self.errors["_"])(response)
+            if self.max_upload_size is not None:
+                size = sum(file.size or 0 for file in files)
+                if size > self.max_upload_size:
+                    for file in files:
+                        file.close()
+                    raise PayloadTooLarge(
+                        message=f"Upload of {size} bytes exceeds the limit of {self.max_upload_size} bytes"
+                    )
+        elif "json" in params:
+            params["data"] = self.codec.dumps(params.pop("json"))
+            request_headers["Content-Type"] = "application/json"
+
+        try:
+            for i in range(attempts):
+                if files:
+                    # FormData can only be sent once, so it's rebuilt around the reopened files on each attempt
+                    formdata = FormData()
+
+                    for fn, file in enumerate(files):
+                        # TODO: use the file name and check for dupes
+                        formdata.add_field(f"file_{fn}", file.open(), filename=file.filename)
+
+                    for k, v in (payload or {}).items():
+                        formdata.add_field(k, v)
+
+                    params["data"] = formdata
+
+                bucket = self.ratelimiter.get_bucket(method, route)
+                await self.ratelimiter.acquire(bucket, interaction=route.interaction, priority=priority)
+
+                try:
+                    response = await self.session.request(
+                        method, self.url + route.route, headers=request_headers, **params
+                    )
+                except BaseException:
+                    self.ratelimiter.release(bucket)
+                    raise
+
+                status = response.status
+                headers = response.headers
+
+                self.ratelimiter.learn(method, route, headers.get("X-RateLimit-Bucket"))
+
+                rl_reset_after = float(headers.get("X-RateLimit-Reset-After", 0))
+
+                # Default here is for non authenticated (and hence non ratelimited) endpoints
+                rl_bucket_remaining = int(headers.get("X-RateLimit-Remaining", 1))
+                rl_sleep_for = 0
+
+                rl_state = {}
+                if "X-RateLimit-Limit" in headers and "X-RateLimit-Remaining" in headers:
+                    rl_state = {
+                        "limit": int(headers["X-RateLimit-Limit"]),
+                        "remaining": rl_bucket_remaining,
+                        "reset_after": rl_reset_after,
+                    }
+
+                if status != 429 and rl_bucket_remaining == 0:
+                    rl_sleep_for = rl_reset_after
+
+                if 200 <= status < 300:
+                    self.ratelimiter.release(bucket, rl_sleep_for, **rl_state)
+                    try:
+                        return await self.response_as(response, expect, self.codec)
+                    except BaseException:
+                        response.release()
+                        raise
+
+                # Every error response is read and released here, so no connection is held by an exception
+                error = await self.read_error(response)
+
+                if status == 429:
+                    if not headers.get("Via"):
+                        self.ratelimiter.release(bucket, **rl_state)
+                        raise TooManyRequests(
+                            status, error.data, error.headers, body=error.body, message="Ratelimited by cloudflare."
+                        )
 
-            if i == attempts - 1:
-                self.ratelimiter.release(bucket, rl_sleep_for)
-                continue
+                    data = error.data if isinstance(error.data, dict) else {}
+                    is_global = data.get("global", False)
+                    rl_sleep_for = data.get("retry_after", rl_reset_after)
 
-            await sleep(rl_sleep_for)
+                    if is_global and not self.proxy:
+                        self.ratelimiter.lock_globally(rl_sleep_for)
 
-        self.ratelimiter.release(bucket)
+                elif status >= 500:
+                    rl_sleep_for = 1 + i * 2
 
-        if status >= 500:
-            raise DiscordServerError(response)
+                else:
+                    self.ratelimiter.release(bucket, rl_sleep_for, **rl_state)
+                    raise error
+
+                self.ratelimiter.release(bucket, rl_sleep_for, **rl_state)
+
+                if i < attempts - 1:
+                    await sleep(rl_sleep_for)
+
+            raise error
+        finally:
+            for file in files or ():
+                file.close()
 
-        raise self.errors.get(status, self.errors["_"])(response)
+    async def spawn_ws(self, url: str, *, compress: bool = False, encoding: str = "json"):
+        """Open a websocket connection to the gateway.
+
+        Args:
+            url (str): The gateway URL to connect to.
+            compress (bool, optional): Whether to request zlib-stream transport compression. Defaults to False.
+            encoding (str, optional): The gateway encoding to use, 'json' or 'etf'. Defaults to 'json'.
+        """
 
-    async def spawn_ws(self, url: str):
         if not self.session or self.session.closed:
-            self.session = ClientSession(headers=self.headers)
+            self.create_session()
+
+        params = {"v": 9, "encoding": encoding}
+        if compress:
+            params["compress"] = "zlib-stream"
 
         args = {
             "max_msg_size": 0,
             "timeout": 60,
             "autoclose": False,
             "headers": {"User-Agent": self.headers["User-Agent"]},
+            "params": params,
         }
 
         return await self.session.ws_connect(url, **args)
 
+    def create_session(self) -> ClientSession:
+        """Create the client session using the configured connection pool."""
+
+        self.session = ClientSession(
+            headers=self.headers,
+            connector=self.connector.create_connector(),
+            trace_configs=[self.pool_stats.trace_config],
+        )
+
+        return self.session
+
+    async def start(self) -> None:
+        """Open the session and warm up connections ahead of the first request.
+
+        Up to ConnectorConfig.warmup connections are opened concurrently with unratelimited requests, so the
+        TCP and TLS handshakes aren't paid by the first real requests. Does nothing if already started.
+        """
+
+        if self.session and not self.session.closed:
+            return
+
+        self.create_session()
+
+        async def warm() -> None:
+            try:
+                async with self.session.get(self.url + "/gateway") as response:
+                    await response.read()
+            except Exception as e:
+                log.warning("Failed to warm up an HTTP connection: %s", e)
+
+        await gather(*(warm() for _ in range(self.connector.warmup)))
+
+    @property
+    def stats(self) -> dict:
+        """Connection pool, cache and ratelimiter statistics."""
+
+        return {
+            "pool": {**self.pool_stats.as_dict(), "limit": self.connector.limit},
+            "cache": self.cache.stats,
+            "ratelimiter": self.ratelimiter.stats,
+        }
+
     async def close(self) -> None:
         await self.session.close()
 
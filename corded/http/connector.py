@@ -0,0 +1,113 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from dataclasses import dataclass
+from ssl import SSLContext, create_default_context
+from time import perf_counter
+from typing import Optional
+
+from aiohttp import TCPConnector, TraceConfig
+
+
+@dataclass
+class ConnectorConfig:
+    """Connection pool settings for an HTTPClient.
+
+    Attributes:
+        limit (int): The total number of simultaneous connections, 0 for unlimited.
+        limit_per_host (int): The number of simultaneous connections to one host, 0 for unlimited.
+        keepalive_timeout (float): How long idle connections are kept open for reuse, in seconds.
+        use_dns_cache (bool): Whether to cache DNS lookups.
+        ttl_dns_cache (Optional[int]): How long DNS lookups are cached for in seconds, None for forever.
+        ssl (Optional[SSLContext]): The SSL context to use, shared by every connection so TLS sessions can be
+            resumed. Defaults to a new default context.
+        warmup (int): How many connections HTTPClient.start opens ahead of the first request.
+    """
+
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30
+    use_dns_cache: bool = True
+    ttl_dns_cache: Optional[int] = 300
+    ssl: Optional[SSLContext] = None
+    warmup: int = 2
+
+    def create_connector(self) -> TCPConnector:
+        return TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.use_dns_cache,
+            ttl_dns_cache=self.ttl_dns_cache,
+            ssl=self.ssl or create_default_context(),
+        )
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        """Connection pool utilization counters, collected through aiohttp request tracing."""
+
+        self.created = 0
+        self.reused = 0
+        self.active = 0
+        self.queued = 0
+        self.queue_time = 0.0
+
+        self.trace_config = TraceConfig()
+        self.trace_config.on_connection_create_end.append(self.on_create)
+        self.trace_config.on_connection_reuseconn.append(self.on_reuse)
+        self.trace_config.on_connection_queued_start.append(self.on_queued_start)
+        self.trace_config.on_connection_queued_end.append(self.on_queued_end)
+        self.trace_config.on_request_start.append(self.on_request_start)
+        self.trace_config.on_request_end.append(self.on_request_end)
+        self.trace_config.on_request_exception.append(self.on_request_end)
+
+    async def on_create(self, session, context, params) -> None:
+        self.created += 1
+
+    async def on_reuse(self, session, context, params) -> None:
+        self.reused += 1
+
+    async def on_queued_start(self, session, context, params) -> None:
+        self.queued += 1
+        context.queued_at = perf_counter()
+
+    async def on_queued_end(self, session, context, params) -> None:
+        self.queue_time += perf_counter() - context.queued_at
+
+    async def on_request_start(self, session, context, params) -> None:
+        self.active += 1
+
+    async def on_request_end(self, session, context, params) -> None:
+        self.active -= 1
+
+    def as_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "active": self.active,
+            "queued": self.queued,
+            "queue_time": self.queue_time,
+        }
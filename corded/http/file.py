@@ -22,17 +22,137 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from io import IOBase
+from io import IOBase, SEEK_END
+from mmap import ACCESS_READ, mmap
+from os import PathLike, fspath, stat
+from os.path import basename
+from typing import Any, Optional, Union
+
+FileSource = Union[IOBase, bytes, bytearray, memoryview, mmap, str, PathLike]
 
 
 class File:
-    def __init__(self, file: IOBase, filename: str) -> None:
+    def __init__(self, file: FileSource, filename: str = None) -> None:
         """A file object representing Discord files.
 
+        Files can be given as an open file object, bytes-like data (including a memory map), or a path.
+        Paths are opened for each upload attempt and read by aiohttp in a thread, so large files are
+        streamed without blocking the event loop or being loaded into memory.
+
         Args:
-            file (IOBase): The file to upload.
-            filename (str): The filename to use.
+            file (FileSource): The file to upload.
+            filename (str, optional): The filename to use. Defaults to the basename of the path, if a path is given.
         """
 
+        self.path: Optional[str] = None
+        self.opened: Optional[IOBase] = None
+        self.view: Optional[memoryview] = None
+        self.start = 0
+
+        # Whether the file was created by this object and should be released by close
+        self.owned = False
+
+        if isinstance(file, (str, PathLike)):
+            self.path = fspath(file)
+            filename = filename or basename(self.path)
+        elif isinstance(file, IOBase):
+            self.start = file.tell() if file.seekable() else 0
+
+        if not filename:
+            raise ValueError("filename must be given unless the file is a path")
+
         self.file = file
         self.filename = filename
+
+    @classmethod
+    def from_path(cls, path: Union[str, PathLike], filename: str = None) -> "File":
+        """Create a File which streams from a path.
+
+        Args:
+            path (Union[str, PathLike]): The path of the file.
+            filename (str, optional): The filename to use. Defaults to the basename of the path.
+        """
+
+        return cls(path, filename)
+
+    @classmethod
+    def from_mmap(cls, path: Union[str, PathLike], filename: str = None) -> "File":
+        """Create a File backed by a read-only memory map of a path.
+
+        The map is closed by File.close, which HTTPClient calls once the upload has finished.
+
+        Args:
+            path (Union[str, PathLike]): The path of the file.
+            filename (str, optional): The filename to use. Defaults to the basename of the path.
+        """
+
+        path = fspath(path)
+
+        with open(path, "rb") as f:
+            mapped = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+        file = cls(mapped, filename or basename(path))
+        file.owned = True
+
+        return file
+
+    @property
+    def size(self) -> Optional[int]:
+        """The number of bytes that will be uploaded, or None if it can't be determined."""
+
+        file = self.file
+
+        if self.path is not None:
+            return stat(self.path).st_size
+        if isinstance(file, (bytes, bytearray, mmap)):
+            return len(file)
+        if isinstance(file, memoryview):
+            return file.nbytes
+        if file.seekable():
+            position = file.tell()
+            end = file.seek(0, SEEK_END)
+            file.seek(position)
+            return end - self.start
+
+        return None
+
+    def open(self) -> Any:
+        """Get a value aiohttp can upload, rewinding or reopening the file for retries."""
+
+        file = self.file
+
+        if self.path is not None:
+            self.close()
+            self.opened = open(self.path, "rb")
+            return self.opened
+        if isinstance(file, mmap):
+            if self.view is None:
+                self.view = memoryview(file)
+            return self.view
+        if isinstance(file, IOBase):
+            if file.seekable():
+                file.seek(self.start)
+            return file
+
+        return file
+
+    def seek(self, offset: int) -> None:
+        if isinstance(self.file, IOBase):
+            self.file.seek(offset)
+
+    def close(self) -> None:
+        """Close the file handle opened for the last upload attempt, and the memory map made by from_mmap.
+
+        Memory maps passed in directly are left open for the caller to close.
+        """
+
+        if self.opened:
+            self.opened.close()
+            self.opened = None
+
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+
+        if self.owned and not self.file.closed:
+            self.file.close()
@@ -0,0 +1,147 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, Event, get_event_loop
+
+from aiohttp import web
+
+from corded.errors import HTTPError
+
+from .client import HTTPClient
+from .route import Route
+
+# Headers forwarded from the incoming request to Discord
+REQUEST_HEADERS = ("Content-Type", "X-Audit-Log-Reason")
+
+# Headers that describe the proxy's own connection rather than the response
+HOP_HEADERS = frozenset(
+    h.lower()
+    for h in (
+        "Connection",
+        "Content-Encoding",
+        "Content-Length",
+        "Keep-Alive",
+        "Transfer-Encoding",
+        "Set-Cookie",
+    )
+)
+
+
+class RatelimitProxy:
+    def __init__(
+        self,
+        token: str,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        url: str = None,
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """A local HTTP proxy which owns a single ratelimiter and forwards requests to Discord.
+
+        Point HTTPClient(proxy=...) in every process at the proxy so they all share one view of the
+        ratelimit buckets and the global limit. Requests must use the same token as the proxy.
+
+        The proxy owns the global limit and retries 429s and server errors itself, clients using it skip their own
+        global limiter and make a single attempt, so a request is never retried by both sides.
+
+        Args:
+            token (str): The bot token to make requests with.
+            host (str, optional): The host to listen on. Defaults to 127.0.0.1.
+            port (int, optional): The port to listen on. Defaults to 8080.
+            url (str, optional): The upstream API URL. Defaults to corded.constants.API_URL.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.token = token
+        self.host = host
+        self.port = port
+        self.loop = loop or get_event_loop()
+
+        self.http = HTTPClient(token, url=url, loop=self.loop)
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/{path:.*}", self.handle)
+
+        self.runner: web.AppRunner = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if request.headers.get("Authorization") != self.http.headers["Authorization"]:
+            return web.json_response({"message": "401: Unauthorized", "code": 0}, status=401)
+
+        route = Route.from_path(request.path)
+
+        headers = {h: request.headers[h] for h in REQUEST_HEADERS if h in request.headers}
+        params = {}
+
+        if request.query_string:
+            params["params"] = request.query
+        if request.body_exists:
+            params["data"] = await request.read()
+
+        try:
+            response = await self.http.request(
+                request.method, route, expect="response", headers=headers, **params
+            )
+        except HTTPError as e:
+            status, body, response_headers = e.status, e.body, e.headers
+        else:
+            status, body, response_headers = response.status, await response.read(), response.headers
+            response.release()
+
+        return web.Response(
+            status=status,
+            body=body,
+            headers={k: v for k, v in response_headers.items() if k.lower() not in HOP_HEADERS},
+        )
+
+    async def start(self) -> None:
+        """Start serving requests."""
+
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+
+    async def close(self) -> None:
+        """Stop serving requests and close the upstream session."""
+
+        if self.runner:
+            await self.runner.cleanup()
+        if self.http.session:
+            await self.http.close()
+
+    def run(self) -> None:
+        """Make a blocking call to run the proxy until interrupted."""
+
+        self.loop.run_until_complete(self.start())
+
+        try:
+            self.loop.run_until_complete(Event().wait())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.loop.run_until_complete(self.close())
@@ -22,50 +22,477 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from asyncio import AbstractEventLoop, Event, Lock, get_event_loop
+from asyncio import AbstractEventLoop, CancelledError, Event, Future, TimerHandle, get_event_loop
+from collections import OrderedDict, deque
+from enum import IntEnum
+from heapq import heappop, heappush
+from itertools import count
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .route import Route
+
+
+class Priority(IntEnum):
+    LOW = -10
+    NORMAL = 0
+    HIGH = 10
+    CRITICAL = 20
+
+
+class WaitQueue:
+    def __init__(self, loop: AbstractEventLoop, max_wait: float = 5) -> None:
+        """A queue of waiters served highest priority first, in order within a priority.
+
+        A waiter which has been queued for longer than max_wait is served before anything else,
+        so low priority requests can't be starved by a steady stream of higher priority ones.
+
+        Args:
+            loop (AbstractEventLoop): The event loop to use.
+            max_wait (float, optional): How long a waiter can be overtaken for in seconds. Defaults to 5.
+        """
+
+        self.loop = loop
+        self.max_wait = max_wait
+
+        self.heap: List[Tuple[int, int, Future]] = []
+        self.order: Deque[Tuple[float, Future]] = deque()
+        self.counter = count()
+
+        self.promoted = 0
+
+    def __bool__(self) -> bool:
+        # Finished futures are removed lazily, so prune them before answering
+        heap = self.heap
+        while heap and heap[0][2].done():
+            heappop(heap)
+
+        if not heap:
+            self.order.clear()
+
+        return bool(heap)
+
+    def __len__(self) -> int:
+        return sum(not future.done() for _, _, future in self.heap)
+
+    def push(self, priority: int = 0) -> Future:
+        """Add a waiter and return the future it should wait on.
+
+        Args:
+            priority (int, optional): The waiter's priority, higher is served first. Defaults to 0.
+        """
+
+        future = self.loop.create_future()
+
+        heappush(self.heap, (-priority, next(self.counter), future))
+        self.order.append((self.loop.time(), future))
+
+        return future
+
+    def pop(self) -> Optional[Future]:
+        """Remove and return the next waiter, or None if there are no waiters left."""
+
+        order = self.order
+        while order and order[0][1].done():
+            order.popleft()
+
+        if order and self.loop.time() - order[0][0] >= self.max_wait:
+            self.promoted += 1
+            return order.popleft()[1]
+
+        heap = self.heap
+        while heap:
+            future = heappop(heap)[2]
+            if not future.done():
+                return future
+
+        return None
+
+
+class Bucket:
+    def __init__(self, loop: AbstractEventLoop, max_wait: float = 5) -> None:
+        """A token bucket tracking the ratelimit state Discord reports for one bucket.
+
+        Until the bucket's limit is known, or while it is exhausted, requests run one at a time.
+        Otherwise up to `remaining` requests may be in flight at once.
+
+        Args:
+            loop (AbstractEventLoop): The event loop to use.
+            max_wait (float, optional): How long a waiter can be overtaken by higher priorities. Defaults to 5.
+        """
+
+        self.loop = loop
+
+        self.limit: Optional[int] = None
+        self.remaining = 1
+        self.reset_at = 0.0
+
+        self.in_flight = 0
+        self.waiters = WaitQueue(loop, max_wait)
+        self.timer: Optional[TimerHandle] = None
+
+        self.last_used = loop.time()
+
+    def __repr__(self) -> str:
+        return (
+            f"<Bucket limit={self.limit} remaining={self.remaining}"
+            f" in_flight={self.in_flight} waiters={len(self.waiters)}>"
+        )
+
+    def available(self) -> bool:
+        now = self.loop.time()
+
+        if self.limit is None:
+            return self.in_flight == 0 and now >= self.reset_at
+
+        if now >= self.reset_at and self.remaining <= 0:
+            self.remaining = self.limit
+
+        return self.remaining > 0
+
+    def take(self) -> None:
+        self.in_flight += 1
+        if self.limit is not None:
+            self.remaining -= 1
+
+    def give_back(self) -> None:
+        self.in_flight -= 1
+        if self.limit is not None:
+            self.remaining += 1
+        self.wake()
+
+    async def acquire(self, priority: int = 0) -> None:
+        if not self.waiters and self.available():
+            return self.take()
+
+        future = self.waiters.push(priority)
+        self.wake()
+
+        try:
+            await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                self.give_back()
+            raise
+
+    def release(
+        self,
+        after: float = 0,
+        *,
+        limit: Optional[int] = None,
+        remaining: Optional[int] = None,
+        reset_after: Optional[float] = None,
+    ) -> None:
+        now = self.loop.time()
+        self.in_flight -= 1
+
+        if limit is not None and remaining is not None:
+            # Responses can arrive out of order, only trust the lower count unless the window has rolled over
+            window_expired = now >= self.reset_at
+            self.remaining = remaining if window_expired or self.limit is None else min(self.remaining, remaining)
+            self.limit = limit
+
+            if reset_after is not None:
+                self.reset_at = now + reset_after
+
+        if after:
+            self.reset_at = max(self.reset_at, now + after)
+            if self.limit is not None:
+                self.remaining = 0
+
+        self.wake()
+
+    def wake(self) -> None:
+        waiters = self.waiters
+
+        while waiters and self.available():
+            future = waiters.pop()
+
+            if future is None:
+                break
+
+            self.take()
+            future.set_result(None)
+
+        if waiters and self.timer is None and self.reset_at > self.loop.time():
+            self.timer = self.loop.call_at(self.reset_at, self.on_reset)
+
+    def on_reset(self) -> None:
+        self.timer = None
+        self.wake()
+
+    @property
+    def idle(self) -> bool:
+        return not self.in_flight and not self.waiters
+
+    def evictable(self, now: float) -> bool:
+        """Whether the bucket can be forgotten without losing any ratelimit information."""
+
+        return self.idle and now >= self.reset_at
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        per: float = 1,
+        *,
+        max_wait: float = 5,
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """A token bucket which proactively limits how fast requests are sent.
+
+        Args:
+            rate (float): The number of requests allowed per period.
+            per (float, optional): The period in seconds. Defaults to 1.
+            max_wait (float, optional): How long a waiter can be overtaken by higher priorities. Defaults to 5.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.rate = rate
+        self.per = per
+        self.loop = loop or get_event_loop()
+
+        self.tokens = float(rate)
+        self.updated = self.loop.time()
+
+        self.waiters = WaitQueue(self.loop, max_wait)
+        self.timer: Optional[TimerHandle] = None
+
+    def refill(self) -> None:
+        now = self.loop.time()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Wait for a token to become available and take it.
+
+        Args:
+            priority (int, optional): The priority of the request, higher is served first. Defaults to 0.
+        """
+
+        self.refill()
+
+        if self.tokens >= 1 and not self.waiters:
+            self.tokens -= 1
+            return
+
+        future = self.waiters.push(priority)
+        self.wake()
+
+        try:
+            await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += 1
+                self.wake()
+            raise
+
+    def wake(self) -> None:
+        self.refill()
+
+        while self.tokens >= 1 and self.waiters:
+            future = self.waiters.pop()
+
+            if future is None:
+                break
+
+            self.tokens -= 1
+            future.set_result(None)
+
+        if self.waiters and self.timer is None:
+            self.timer = self.loop.call_later((1 - self.tokens) * self.per / self.rate, self.on_refill)
+
+    def on_refill(self) -> None:
+        self.timer = None
+        self.wake()
 
 
 class Ratelimiter:
-    def __init__(self, loop: AbstractEventLoop = None) -> None:
+    def __init__(
+        self,
+        loop: AbstractEventLoop = None,
+        *,
+        max_buckets: int = 10000,
+        bucket_ttl: float = 300,
+        global_rate: Optional[float] = 50,
+        interaction_rate: Optional[float] = None,
+        max_wait: float = 5,
+    ) -> None:
         """A ratelimit handler for API requests.
 
+        Buckets are evicted once they are idle, their reset time has passed and they haven't been used for
+        bucket_ttl seconds, or sooner in least recently used order when there are more than max_buckets.
+
         Args:
             loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+            max_buckets (int, optional): The number of buckets to keep before evicting idle ones. Defaults to 10000.
+            bucket_ttl (float, optional): How long an idle bucket is kept for in seconds. Defaults to 300.
+            global_rate (float, optional): Requests per second allowed before the global limit is hit.
+                Defaults to 50, None disables proactive global limiting.
+            interaction_rate (float, optional): Requests per second for interaction endpoints, which are
+                exempt from the global limit. Defaults to None, which is unlimited.
+            max_wait (float, optional): How long a request can be overtaken by higher priority requests
+                before it is served first, in seconds. Defaults to 5.
         """
 
         self.loop = loop or get_event_loop()
 
-        self.locks = {}
+        self.max_buckets = max_buckets
+        self.bucket_ttl = bucket_ttl
+        self.max_wait = max_wait
+
+        # Ordered from least to most recently used
+        self.buckets: "OrderedDict[str, Bucket]" = OrderedDict()
+        self.evictions = 0
+        self.last_sweep = self.loop.time()
+
+        # (method, route template) -> the bucket hash Discord reported for it
+        self.bucket_hashes: Dict[Tuple[str, str], str] = {}
 
-        self.global_lock = Event(loop=self.loop)
+        self.global_lock = Event()
         self.global_lock.set()
 
-    async def acquire(self, bucket: str) -> None:
-        """Acquire the ratelimit lock on a given bucket.
+        self.global_limiter = None
+        if global_rate:
+            self.global_limiter = TokenBucket(global_rate, max_wait=max_wait, loop=self.loop)
+
+        self.interaction_limiter = None
+        if interaction_rate:
+            self.interaction_limiter = TokenBucket(interaction_rate, max_wait=max_wait, loop=self.loop)
+
+    def get_bucket(self, method: str, route: Route) -> str:
+        """Get the ratelimit bucket key for a request.
+
+        Routes whose real bucket hash has been learned share a key with every other route in that bucket,
+        otherwise the locally computed Route.bucket is used.
+
+        Args:
+            method (str): The HTTP method of the request.
+            route (Route): The route of the request.
+        """
+
+        bucket_hash = self.bucket_hashes.get((method, route.path))
+
+        if bucket_hash is None:
+            return route.bucket
+
+        return f"{bucket_hash}:{route.major}"
+
+    def learn(self, method: str, route: Route, bucket_hash: Optional[str]) -> None:
+        """Record the bucket hash Discord reported for a route.
+
+        Args:
+            method (str): The HTTP method of the request.
+            route (Route): The route of the request.
+            bucket_hash (Optional[str]): The value of the X-RateLimit-Bucket header, if there was one.
+        """
+
+        if bucket_hash:
+            self.bucket_hashes[(method, route.path)] = bucket_hash
+
+    async def acquire(
+        self, bucket: str, *, interaction: bool = False, priority: int = Priority.NORMAL
+    ) -> None:
+        """Acquire a request slot in a given bucket.
+
+        When capacity is limited, higher priority requests are admitted first.
 
         Args:
-            bucket (str): The bucket to acquire the lock on.
+            bucket (str): The bucket to acquire a slot in.
+            interaction (bool, optional): Whether the request is to an interaction endpoint. Defaults to False.
+            priority (int, optional): The priority of the request, higher is served first. Defaults to NORMAL.
         """
 
-        lock = self.locks.get(bucket)
+        buckets = self.buckets
+        state = buckets.get(bucket)
+
+        if state:
+            buckets.move_to_end(bucket)
+            state.last_used = self.loop.time()
+        else:
+            self.evict()
+            state = buckets[bucket] = Bucket(self.loop, self.max_wait)
 
-        if not lock:
-            lock = Lock(loop=self.loop)
-            self.locks[bucket] = lock
+        await state.acquire(priority)
 
-        await lock.acquire()
-        await self.global_lock.wait()
+        try:
+            if interaction:
+                if self.interaction_limiter:
+                    await self.interaction_limiter.acquire(priority)
+            else:
+                await self.global_lock.wait()
 
-    def release(self, bucket: str, after: float = 0) -> None:
-        """Release the ratelimit lock on a given bucket
+                if self.global_limiter:
+                    await self.global_limiter.acquire(priority)
+        except CancelledError:
+            state.give_back()
+            raise
+
+    def release(
+        self,
+        bucket: str,
+        after: float = 0,
+        *,
+        limit: Optional[int] = None,
+        remaining: Optional[int] = None,
+        reset_after: Optional[float] = None,
+    ) -> None:
+        """Release a request slot in a given bucket, updating its state from the response headers.
 
         Args:
-            bucket (str): The bucket to release the lock on.
+            bucket (str): The bucket to release the slot in.
+            after (float, optional): How long to block the bucket for, e.g. a 429 retry_after. Defaults to 0.
+            limit (int, optional): The value of X-RateLimit-Limit.
+            remaining (int, optional): The value of X-RateLimit-Remaining.
+            reset_after (float, optional): The value of X-RateLimit-Reset-After.
         """
 
-        lock = self.locks[bucket]
+        self.buckets[bucket].release(after, limit=limit, remaining=remaining, reset_after=reset_after)
+
+    def evict(self) -> None:
+        """Evict idle buckets which have expired, or which are over the size limit."""
+
+        now = self.loop.time()
+        buckets = self.buckets
+
+        sweep = now - self.last_sweep >= self.bucket_ttl / 4
+        if not sweep and len(buckets) < self.max_buckets:
+            return
+
+        if sweep:
+            self.last_sweep = now
+
+        expired = []
+        over = len(buckets) - self.max_buckets + 1
+
+        for key, state in buckets.items():
+            stale = now - state.last_used >= self.bucket_ttl
+
+            if not stale and over <= 0:
+                break
+
+            if state.evictable(now):
+                expired.append(key)
+                over -= 1
+
+        for key in expired:
+            del buckets[key]
+
+        self.evictions += len(expired)
+
+    @property
+    def size(self) -> int:
+        """The number of buckets currently tracked."""
+
+        return len(self.buckets)
 
-        self.loop.call_later(after, lock.release)
+    @property
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self.buckets),
+            "evictions": self.evictions,
+            "bucket_hashes": len(self.bucket_hashes),
+        }
 
     def lock_globally(self, duration: float) -> None:
         """Lock the global ratelimit lock for a set duration.
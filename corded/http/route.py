@@ -22,8 +22,44 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from functools import lru_cache
+from sys import intern
+from typing import Tuple
+
+MAJOR_PARAMETERS = {
+    "guilds": "guild_id",
+    "channels": "channel_id",
+    "webhooks": "webhook_id",
+}
+
+# Path segments following these are variable but don't affect the bucket
+MINOR_PARAMETERS = {
+    "interactions": "interaction_id",
+    "reactions": "emoji",
+}
+
+# Templates exempt from the global ratelimit, interaction responses and their followup webhooks
+INTERACTION_PREFIXES = ("/interactions/", "/webhooks/{application_id}/{interaction_token}")
+
+
+@lru_cache(maxsize=4096)
+def compile_template(path: str) -> Tuple[str, bool, bool]:
+    """Intern a route template and work out whether it needs formatting at all.
+
+    Args:
+        path (str): The route template.
+
+    Returns:
+        Tuple[str, bool, bool]: The interned template, whether it needs formatting and whether
+            it is an interaction endpoint.
+    """
+
+    return intern(path), "{" in path or "}" in path, path.startswith(INTERACTION_PREFIXES)
+
 
 class Route:
+    __slots__ = ("path", "route", "major", "bucket", "interaction")
+
     def __init__(self, path: str, **params) -> None:
         """Represents a Discord API route, used for ratelimit handling.
 
@@ -32,11 +68,56 @@ class Route:
             params: The parameters to format the path with.
         """
 
-        self.route = path.format(**params)
+        path, has_fields, interaction = compile_template(path)
+
+        self.path = path
+        self.interaction = interaction
+        self.route = path.format_map(params) if has_fields else path
 
         # Key ratelimit handling parameters
         guild_id = params.get("guild_id", 0)
         channel_id = params.get("channel_id", 0)
         webhook_id = params.get("webhook_id", 0)
 
-        self.bucket = f"{guild_id}-{channel_id}-{webhook_id}::{path}"
+        self.major = f"{guild_id}-{channel_id}-{webhook_id}"
+        self.bucket = f"{self.major}::{path}"
+
+    def __repr__(self) -> str:
+        return f"<Route route={self.route!r} bucket={self.bucket!r}>"
+
+    @classmethod
+    def from_path(cls, path: str) -> "Route":
+        """Rebuild a Route from an already formatted API path, for example one received by a proxy.
+
+        Major parameters are recovered so the bucket matches the one a Route created with a template would
+        use, other snowflakes and tokens are replaced with placeholders.
+
+        Args:
+            path (str): The formatted API path, without the API base URL.
+        """
+
+        segments = path.split("/")
+        template = []
+        params = {}
+        previous = None
+
+        for i, segment in enumerate(segments):
+            if previous in MAJOR_PARAMETERS and segment.isdigit():
+                name = MAJOR_PARAMETERS[previous]
+                params[name] = segment
+                template.append(f"{{{name}}}")
+            elif previous in MINOR_PARAMETERS:
+                template.append(f"{{{MINOR_PARAMETERS[previous]}}}")
+                params[MINOR_PARAMETERS[previous]] = segment
+            elif segment.isdigit():
+                template.append(f"{{id_{i}}}")
+                params[f"id_{i}"] = segment
+            elif template and template[-1] in ("{webhook_id}", "{interaction_id}"):
+                template.append("{token}")
+                params["token"] = segment
+            else:
+                template.append(segment)
+
+            previous = segment
+
+        return cls("/".join(template), **params)
@@ -0,0 +1,93 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import get_event_loop
+from os import PathLike
+from typing import AsyncIterator, Union
+
+from aiohttp import ClientResponse
+
+
+class StreamedResponse:
+    def __init__(self, response: ClientResponse, chunk_size: int = 65536) -> None:
+        """A response whose body is read in chunks rather than all at once.
+
+        Iterate over it to receive chunks, or use save to write it straight to disk. The underlying
+        connection is released once the body has been fully read or close is called.
+
+        Args:
+            response (ClientResponse): The response to stream.
+            chunk_size (int, optional): The maximum size of each chunk. Defaults to 65536.
+        """
+
+        self.response = response
+        self.chunk_size = chunk_size
+
+        self.status = response.status
+        self.headers = response.headers
+
+    @property
+    def size(self) -> int:
+        """The size of the body from the Content-Length header, or None if it wasn't sent."""
+
+        return self.response.content_length
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self.response.content.iter_chunked(self.chunk_size):
+                yield chunk
+        finally:
+            self.close()
+
+    async def __aenter__(self) -> "StreamedResponse":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+    async def save(self, path: Union[str, PathLike]) -> int:
+        """Write the body to a file, returning the number of bytes written.
+
+        Args:
+            path (Union[str, PathLike]): The path to write to.
+        """
+
+        loop = get_event_loop()
+        written = 0
+
+        f = await loop.run_in_executor(None, open, path, "wb")
+        try:
+            async for chunk in self:
+                await loop.run_in_executor(None, f.write, chunk)
+                written += len(chunk)
+        finally:
+            await loop.run_in_executor(None, f.close)
+
+        return written
+
+    def close(self) -> None:
+        """Release the connection without reading the rest of the body."""
+
+        self.response.release()
@@ -24,5 +24,6 @@ SOFTWARE.
 
 from .base import Object
 from .gateway import GatewayEvent, Intents
+from .models import Model
 
-__all__ = (Object, GatewayEvent, Intents)
+__all__ = (Object, GatewayEvent, Intents, Model)
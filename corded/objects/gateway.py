@@ -1,26 +1,123 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any, Dict, Literal, Optional, Tuple, Union
 
 import corded
-from corded.helpers import int_types
+from corded.helpers import int_types, lazy_types
+
+from .models import Model, model_for
 
 Direction = Union[Literal["inbound"], Literal["outbound"]]
 
 
-@dataclass
+_UNSET = object()
+
+
 class GatewayEvent:
-    shard: "corded.ws.shard.Shard"
-    direction: Direction
-    op: int
-    d: Optional[Any]
-    s: Optional[int] = None
-    t: Optional[str] = None
+    __slots__ = ("shard", "direction", "op", "d", "s", "t", "_typed_data", "_typed_view", "_model")
+
+    def __init__(
+        self,
+        shard: "corded.ws.shard.Shard",
+        direction: Direction,
+        op: int,
+        d: Optional[Any],
+        s: Optional[int] = None,
+        t: Optional[str] = None,
+    ) -> None:
+        """An event sent or received over the gateway.
+
+        Args:
+            shard (corded.ws.shard.Shard): The shard the event was sent or received on.
+            direction (Direction): Whether the event is inbound or outbound.
+            op (int): The gateway opcode.
+            d (Optional[Any]): The event data.
+            s (Optional[int], optional): The sequence number. Defaults to None.
+            t (Optional[str], optional): The dispatch event name. Defaults to None.
+        """
+
+        self.shard = shard
+        self.direction = direction
+        self.op = op
+        self.d = d
+        self.s = s
+        self.t = t
+
+        self._typed_data = _UNSET
+        self._typed_view = _UNSET
+        self._model = _UNSET
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(shard={self.shard!r}, direction={self.direction!r},"
+            f" op={self.op!r}, d={self.d!r}, s={self.s!r}, t={self.t!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.shard, self.direction, self.op, self.d, self.s, self.t) == (
+            other.shard,
+            other.direction,
+            other.op,
+            other.d,
+            other.s,
+            other.t,
+        )
+
+    __hash__ = None
+
+    @property
+    def _is_typed(self) -> bool:
+        # ETF carries snowflakes as native integers already
+        return self.shard is not None and self.shard.parent.encoding == "etf"
 
     @property
     def typed_data(self) -> Any:
-        return int_types(self.d) if self.d else None
+        """The event data with numeric strings converted to ints, computed once per event."""
+
+        if self._typed_data is _UNSET:
+            if not self.d:
+                self._typed_data = None
+            elif self._is_typed:
+                self._typed_data = self.d
+            else:
+                self._typed_data = int_types(self.d)
+
+        return self._typed_data
+
+    @property
+    def typed_view(self) -> Any:
+        """A lazy, read-only view of typed_data that only converts the parts which are accessed."""
+
+        if self._typed_view is _UNSET:
+            if self._typed_data is not _UNSET:
+                self._typed_view = self._typed_data
+            elif not self.d:
+                self._typed_view = None
+            elif self._is_typed:
+                self._typed_view = self.d
+            else:
+                self._typed_view = lazy_types(self.d)
+
+        return self._typed_view
+
+    @property
+    def model(self) -> Union[Model, Any]:
+        """The event data as a compiled model for known dispatch events, converting only snowflake fields.
+
+        Events without a model fall back to typed_data.
+        """
+
+        if self._model is _UNSET:
+            cls = model_for(self.t)
+
+            if cls and isinstance(self.d, dict):
+                self._model = cls(self.d)
+            else:
+                self._model = self.typed_data
+
+        return self._model
 
     @property
     def dispatch_name(self) -> str:
@@ -0,0 +1,273 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from typing import Any, Dict, Iterable, Optional, Tuple, Type, Union
+
+Tree = Dict[str, Union[bool, "Tree"]]
+
+EACH = "[]"
+
+
+def compile_paths(paths: Iterable[str]) -> Tree:
+    """Compile snowflake field paths into a conversion tree.
+
+    Paths are dotted keys, with a `[]` suffix marking a list whose items the rest of the path applies to.
+    For example `author.id`, `mention_roles[]` and `mentions[].id`.
+
+    Args:
+        paths (Iterable[str]): The paths to compile.
+    """
+
+    tree: Tree = {}
+
+    for path in paths:
+        node = tree
+        segments = []
+
+        for segment in path.split("."):
+            if segment.endswith(EACH):
+                segments.extend((segment[: -len(EACH)], EACH))
+            else:
+                segments.append(segment)
+
+        for segment in segments[:-1]:
+            node = node.setdefault(segment, {})
+        node[segments[-1]] = True
+
+    return tree
+
+
+def convert(value: Any, node: Union[bool, Tree]) -> Any:
+    """Convert the snowflakes in a value described by a compiled tree.
+
+    Containers on a converted path are shallow copied, the rest of the payload is shared with the input.
+
+    Args:
+        value (Any): The value to convert.
+        node (Union[bool, Tree]): The compiled tree for the value.
+    """
+
+    if node is True:
+        return int(value) if isinstance(value, str) else value
+
+    if isinstance(value, list):
+        each = node.get(EACH)
+        return [convert(item, each) for item in value] if each else value
+
+    if isinstance(value, dict):
+        value = value.copy()
+        for key, child in node.items():
+            item = value.get(key)
+            if item is not None:
+                value[key] = convert(item, child)
+
+    return value
+
+
+class Model:
+    __slots__ = ("raw",)
+
+    event: Optional[str] = None
+    fields: Tuple[str, ...] = ()
+    tree: Tree = {}
+
+    def __init__(self, data: dict) -> None:
+        """A typed gateway payload which only converts fields that are known to be snowflakes.
+
+        Args:
+            data (dict): The raw event data.
+        """
+
+        raw = self.raw = convert(data, self.tree)
+
+        for field in self.fields:
+            setattr(self, field, raw.get(field))
+
+    def __getitem__(self, key: str) -> Any:
+        return self.raw[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.raw
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__qualname__} id={self.raw.get('id')}>"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.raw.get(key, default)
+
+    def to_dict(self) -> dict:
+        return self.raw
+
+
+MODELS: Dict[str, Type[Model]] = {}
+
+
+def model(name: str, events: Iterable[str], fields: Iterable[str], snowflakes: Iterable[str]) -> Type[Model]:
+    """Generate a slotted model class and register it for the given dispatch events.
+
+    Args:
+        name (str): The name of the class.
+        events (Iterable[str]): The dispatch event names the model is used for.
+        fields (Iterable[str]): The top level fields exposed as attributes.
+        snowflakes (Iterable[str]): The paths of snowflake fields to convert.
+    """
+
+    events = tuple(events)
+    fields = tuple(fields)
+
+    cls = type(
+        name,
+        (Model,),
+        {
+            "__slots__": fields,
+            "__module__": __name__,
+            "event": events[0],
+            "fields": fields,
+            "tree": compile_paths(snowflakes),
+        },
+    )
+
+    for event in events:
+        MODELS[event] = cls
+
+    return cls
+
+
+def model_for(event: Optional[str]) -> Optional[Type[Model]]:
+    """Get the model class registered for a dispatch event, if there is one.
+
+    Args:
+        event (Optional[str]): The dispatch event name, e.g. MESSAGE_CREATE.
+    """
+
+    return MODELS.get(event) if event else None
+
+
+MEMBER = ("user.id", "roles[]")
+USER_MEMBER = ("member.user.id", "member.roles[]")
+
+Message = model(
+    "Message",
+    ("MESSAGE_CREATE", "MESSAGE_UPDATE"),
+    (
+        "id", "channel_id", "guild_id", "author", "member", "content", "timestamp", "edited_timestamp",
+        "tts", "mention_everyone", "mentions", "mention_roles", "attachments", "embeds", "reactions",
+        "pinned", "webhook_id", "type", "message_reference", "referenced_message", "flags", "components",
+    ),
+    (
+        "id", "channel_id", "guild_id", "author.id", "member.roles[]", "mentions[].id",
+        "mentions[].member.roles[]", "mention_roles[]", "attachments[].id", "webhook_id", "application_id",
+        "message_reference.message_id", "message_reference.channel_id", "message_reference.guild_id",
+        "referenced_message.id", "referenced_message.channel_id", "referenced_message.author.id",
+        "sticker_items[].id", "interaction.id", "interaction.user.id", "thread.id", "thread.parent_id",
+    ),
+)
+
+MessageDelete = model(
+    "MessageDelete",
+    ("MESSAGE_DELETE",),
+    ("id", "channel_id", "guild_id"),
+    ("id", "channel_id", "guild_id"),
+)
+
+MessageReaction = model(
+    "MessageReaction",
+    ("MESSAGE_REACTION_ADD", "MESSAGE_REACTION_REMOVE"),
+    ("user_id", "channel_id", "message_id", "guild_id", "member", "emoji"),
+    ("user_id", "channel_id", "message_id", "guild_id", "emoji.id", *USER_MEMBER),
+)
+
+Guild = model(
+    "Guild",
+    ("GUILD_CREATE", "GUILD_UPDATE"),
+    (
+        "id", "name", "owner_id", "roles", "emojis", "features", "member_count", "members", "channels",
+        "threads", "presences", "voice_states", "unavailable", "large",
+    ),
+    (
+        "id", "owner_id", "application_id", "afk_channel_id", "widget_channel_id", "system_channel_id",
+        "rules_channel_id", "public_updates_channel_id", "roles[].id", "emojis[].id", "emojis[].roles[]",
+        "stickers[].id", "members[].user.id", "members[].roles[]", "channels[].id", "channels[].parent_id",
+        "channels[].last_message_id", "channels[].permission_overwrites[].id", "threads[].id",
+        "threads[].parent_id", "threads[].owner_id", "threads[].last_message_id", "voice_states[].user_id",
+        "voice_states[].channel_id", "presences[].user.id", "stage_instances[].id",
+        "stage_instances[].channel_id",
+    ),
+)
+
+GuildMember = model(
+    "GuildMember",
+    ("GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE"),
+    ("guild_id", "user", "nick", "roles", "joined_at", "premium_since", "deaf", "mute", "pending"),
+    ("guild_id", *MEMBER),
+)
+
+GuildMemberRemove = model(
+    "GuildMemberRemove",
+    ("GUILD_MEMBER_REMOVE",),
+    ("guild_id", "user"),
+    ("guild_id", "user.id"),
+)
+
+PresenceUpdate = model(
+    "PresenceUpdate",
+    ("PRESENCE_UPDATE",),
+    ("user", "guild_id", "status", "activities", "client_status"),
+    ("user.id", "guild_id", "activities[].application_id"),
+)
+
+TypingStart = model(
+    "TypingStart",
+    ("TYPING_START",),
+    ("channel_id", "guild_id", "user_id", "timestamp", "member"),
+    ("channel_id", "guild_id", "user_id", *USER_MEMBER),
+)
+
+VoiceState = model(
+    "VoiceState",
+    ("VOICE_STATE_UPDATE",),
+    ("guild_id", "channel_id", "user_id", "member", "session_id"),
+    ("guild_id", "channel_id", "user_id", *USER_MEMBER),
+)
+
+Channel = model(
+    "Channel",
+    ("CHANNEL_CREATE", "CHANNEL_UPDATE", "CHANNEL_DELETE", "THREAD_CREATE", "THREAD_UPDATE", "THREAD_DELETE"),
+    ("id", "type", "guild_id", "name", "position", "parent_id", "owner_id", "last_message_id"),
+    (
+        "id", "guild_id", "parent_id", "owner_id", "last_message_id", "application_id",
+        "permission_overwrites[].id", "recipients[].id",
+    ),
+)
+
+Interaction = model(
+    "Interaction",
+    ("INTERACTION_CREATE",),
+    ("id", "application_id", "type", "data", "guild_id", "channel_id", "member", "user", "token", "message"),
+    (
+        "id", "application_id", "guild_id", "channel_id", "user.id", "data.id", "data.target_id",
+        "message.id", "message.channel_id", "message.author.id", *USER_MEMBER,
+    ),
+)
@@ -1,7 +1,25 @@
 from .client import GatewayClient
+from .dispatch import KeyedScheduler, PoolScheduler, Scheduler, channel_key, guild_key
+from .outbound import SendQueue
+from .ratelimiter import IdentifyScheduler
+from .reconnect import ReconnectCoordinator, ReconnectStats
+from .session import FileSessionStore, MemorySessionStore, SessionState, SessionStore
 from .shard import Shard
 
 __all__ = (
+    FileSessionStore,
     GatewayClient,
+    IdentifyScheduler,
+    KeyedScheduler,
+    MemorySessionStore,
+    PoolScheduler,
+    ReconnectCoordinator,
+    ReconnectStats,
+    Scheduler,
+    SendQueue,
+    SessionState,
+    SessionStore,
     Shard,
+    channel_key,
+    guild_key,
 )
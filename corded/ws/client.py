@@ -22,15 +22,25 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from asyncio import AbstractEventLoop, get_event_loop, sleep
+from asyncio import AbstractEventLoop, Event, TimeoutError, gather, get_event_loop, wait_for
 from collections import defaultdict
+from logging import getLogger
+from typing import Callable, Dict, Optional, Tuple, Union
 
+from corded.codec import CodecLike, get_codec
+from corded.helpers import shard_for_guild
 from corded.objects.gateway import GatewayEvent
 from corded.objects.partials import GetGatewayBot, SessionStartLimit
 
-from .ratelimiter import Ratelimiter
+from .dispatch import Scheduler
+from .handoff import request_handoff, serve_handoff
+from .ratelimiter import IdentifyScheduler
+from .reconnect import ReconnectCoordinator
+from .session import SessionStore
 from .shard import Shard
 
+log = getLogger(__name__)
+
 
 class GatewayClient:
     def __init__(
@@ -40,6 +50,14 @@ class GatewayClient:
         shard_ids: list = None,
         shard_count: int = None,
         *,
+        compress: bool = False,
+        encoding: str = "json",
+        codec: CodecLike = None,
+        scheduler: Scheduler = None,
+        session_store: SessionStore = None,
+        session_save_interval: float = 60,
+        handoff_path: str = None,
+        reconnects: ReconnectCoordinator = None,
         loop: AbstractEventLoop = None,
     ) -> None:
         """A client to connect to the Discord gateway.
@@ -47,38 +65,208 @@ class GatewayClient:
         Args:
             http ([type]): The HTTP client to use for API requests.
             intents (int): The intents to connect with.
-            shard_ids (list, optional): The shard IDs to connect with. Defaults to [0].
+            shard_ids (list, optional): The shard IDs to connect with. Defaults to every shard, an empty list
+                connects none.
             shard_count (int, optional): The total number of shards being used. Defaults to 1.
+            compress (bool, optional): Whether to use zlib-stream transport compression. Defaults to False.
+            encoding (str, optional): The gateway encoding to use, 'json' or 'etf'. Defaults to 'json'.
+            codec (Union[str, JSONCodec], optional): The JSON codec to use. Defaults to the HTTP client's codec.
+            scheduler (Scheduler, optional): The scheduler used to run listeners. Defaults to one task per listener.
+            session_store (SessionStore, optional): Where sessions are saved so shards can resume after a restart.
+                Defaults to not saving sessions.
+            session_save_interval (float, optional): Seconds between session saves. Defaults to 60.
+            handoff_path (str, optional): A unix socket path used to take over shards from the previous process
+                on start, and to hand them to the next one. Defaults to not handing off shards.
+            reconnects (ReconnectCoordinator, optional): Paces shard reconnects. Defaults to ReconnectCoordinator().
             loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
         """
         self.http = http
         self.intents = intents
+        self.compress = compress
+
+        if encoding not in ("json", "etf"):
+            raise ValueError("encoding must be one of 'json', 'etf'")
+        self.encoding = encoding
+        self.codec = get_codec(codec) if codec else http.codec
 
         self.shard_count = shard_count or 1
-        self.shard_ids = shard_ids or list(range(self.shard_count))
+        self.shard_ids = list(range(self.shard_count)) if shard_ids is None else list(shard_ids)
 
         self.loop = loop or get_event_loop()
+        self.scheduler = scheduler or Scheduler(self.loop)
+        self.reconnects = reconnects or ReconnectCoordinator(loop=self.loop)
+        self.session_store = session_store or SessionStore()
+        self.session_save_interval = session_save_interval
+        self.handoff_path = handoff_path
+        self.handoff_server = None
+        self.closed = Event()
 
         self.shards = [Shard(id, self, self.loop) for id in self.shard_ids]
 
+        # An optional limiter shards wait on before identifying, used to coordinate clusters
+        self.identify_limiter = None
+        # The predicted seconds until every shard has identified, set by start
+        self.identify_eta: Optional[float] = None
+        self.cluster = None
+
         self.listeners = defaultdict(list)
         self.dispatch_middleware = []
 
+        # (t or op, direction) -> listeners, compiled on first use and cleared whenever listeners change
+        self.dispatch_table: Dict[Tuple[Union[str, int], str], Tuple[Callable, ...]] = {}
+
+    def add_listener(self, event: str, callback: Callable) -> None:
+        """Add a listener for an event, invalidating the dispatch table.
+
+        Listeners should be added through this method rather than by mutating `listeners` directly.
+
+        Args:
+            event (str): The lowercase event name to listen for.
+            callback (Callable): The coroutine function to call.
+        """
+
+        self.listeners[event].append(callback)
+        self.dispatch_table.clear()
+
+    def remove_listener(self, event: str, callback: Callable) -> None:
+        """Remove a listener for an event, invalidating the dispatch table.
+
+        Args:
+            event (str): The lowercase event name the listener was added for.
+            callback (Callable): The coroutine function to remove.
+        """
+
+        self.listeners[event].remove(callback)
+        self.dispatch_table.clear()
+
+    def add_middleware(self, middleware: Callable) -> None:
+        """Add a dispatch middleware, invalidating the dispatch table.
+
+        Args:
+            middleware (Callable): The coroutine function to call with each event.
+        """
+
+        self.dispatch_middleware.append(middleware)
+        self.dispatch_table.clear()
+
+    def get_listeners(self, t: Optional[str], op: int, direction: str) -> Tuple[Callable, ...]:
+        """Get the compiled listeners for an event.
+
+        Args:
+            t (Optional[str]): The dispatch event name.
+            op (int): The gateway opcode.
+            direction (str): Whether the event is inbound or outbound.
+        """
+
+        key = (t or op, direction)
+
+        try:
+            return self.dispatch_table[key]
+        except KeyError:
+            pass
+
+        listeners = self.listeners
+        name = (t or f"op_{op}").lower()
+
+        compiled = (
+            *listeners.get(name, ()),
+            *listeners.get("gateway_send" if direction == "outbound" else "gateway_receive", ()),
+            *listeners.get("*", ()),
+        )
+        self.dispatch_table[key] = compiled
+
+        return compiled
+
+    def wants(self, t: Optional[str], op: int, direction: str) -> bool:
+        """Check whether an event would be seen by any middleware or listener.
+
+        Args:
+            t (Optional[str]): The dispatch event name.
+            op (int): The gateway opcode.
+            direction (str): Whether the event is inbound or outbound.
+        """
+
+        return bool(self.dispatch_middleware or self.get_listeners(t, op, direction))
+
+    def shard_for_guild(self, guild_id: Union[int, str]) -> int:
+        """Get the ID of the shard which receives events for a guild.
+
+        Args:
+            guild_id (Union[int, str]): The ID of the guild.
+        """
+
+        return shard_for_guild(guild_id, self.shard_count)
+
     async def panic(self, code) -> None:
         raise SystemExit(f"Shard error code: {code}")
 
     async def start(self) -> None:
+        await self.http.start()
+
+        if self.handoff_path:
+            shards = {shard.id: shard for shard in self.shards}
+            for shard_id, state in (await request_handoff(self, self.handoff_path)).items():
+                shards[shard_id].restore(state)
+
+        await self.restore_sessions()
+
         gateway: GetGatewayBot = await self.http.get_gateway_bot()
         limit: SessionStartLimit = gateway.session_start_limit
 
-        limiter = Ratelimiter(limit.max_concurrency, 5, self.loop)
+        # Cluster workers are given a limiter shared with the other processes
+        if not self.identify_limiter:
+            self.identify_limiter = IdentifyScheduler.from_limit(limit, loop=self.loop)
+
+        if isinstance(self.identify_limiter, IdentifyScheduler):
+            self.identify_eta = self.identify_limiter.predict(shard.id for shard in self.shards if not shard.session)
 
+        # Shards identify as soon as their identify bucket allows, see IdentifyScheduler
         for shard in self.shards:
-            await limiter.wait()
-            self.loop.create_task(shard.connect())
+            shard.start()
+
+        if self.handoff_path:
+            self.handoff_server = await serve_handoff(self, self.handoff_path)
 
-        while True:
-            await sleep(1)
+        # Runs until every shard has been handed off or close is called
+        while not self.closed.is_set():
+            try:
+                await wait_for(self.closed.wait(), self.session_save_interval)
+            except TimeoutError:
+                await self.save_sessions()
+
+    async def restore_sessions(self) -> None:
+        """Restore each shard's saved session from the session store, so they resume instead of identifying."""
+
+        for shard in self.shards:
+            if shard.session:
+                continue
+
+            if state := await self.session_store.load(shard.id):
+                shard.restore(state)
+
+    async def save_sessions(self) -> None:
+        """Save each shard's session to the session store, except shards handed off to another process."""
+
+        states = {shard.id: shard.session_state() for shard in self.shards if not shard.handed_off}
+
+        if not states:
+            return
+
+        try:
+            await self.session_store.save(states)
+        except Exception:
+            log.exception("Failed to save gateway sessions")
+
+    async def close(self) -> None:
+        """Stop every shard, keeping their sessions resumable, and save the sessions."""
+
+        self.closed.set()
+
+        if self.handoff_server:
+            self.handoff_server.close()
+
+        await gather(*(shard.stop() for shard in self.shards if not shard.handed_off))
+        await self.save_sessions()
 
     async def dispatch(self, event: GatewayEvent) -> None:
         for middleware in self.dispatch_middleware:
@@ -92,20 +280,13 @@ class GatewayClient:
                     f"Type of event returned by middleware {middleware.__name__}, {event.__class__.__qualname__}, is not a valid GatewayEvent."
                 )
 
-        all_listeners = [
-            *self.listeners[event.dispatch_name],
-            *(
-                self.listeners["gateway_send"]
-                if event.direction == "outbound"
-                else self.listeners["gateway_receive"]
-            ),
-            *self.listeners["*"],
-        ]
-
-        for listener in all_listeners:
-            self.loop.create_task(listener(event))
+        if listeners := self.get_listeners(event.t, event.op, event.direction):
+            await self.scheduler.submit(event, listeners)
 
     async def dispatch_recv(self, shard: Shard, data: dict) -> None:
+        if not self.wants(data.get("t"), data["op"], "inbound"):
+            return
+
         await self.dispatch(GatewayEvent(shard, "inbound", **data))
 
     async def dispatch_send(self, shard: Shard, data: dict) -> None:
@@ -0,0 +1,273 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, Queue, Semaphore, Task, gather, get_event_loop
+from collections import deque
+from time import perf_counter
+from typing import Callable, Deque, Dict, Hashable, List, Literal, Optional, Sequence, Tuple
+
+from corded.objects.gateway import GatewayEvent
+
+Overflow = Literal["block", "drop"]
+KeyFunction = Callable[[GatewayEvent], Optional[Hashable]]
+
+
+# Events whose payload is the guild or channel itself, so its ID is in "id"
+GUILD_EVENTS = frozenset(("GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE"))
+CHANNEL_EVENTS = frozenset(
+    (
+        "CHANNEL_CREATE",
+        "CHANNEL_UPDATE",
+        "CHANNEL_DELETE",
+        "THREAD_CREATE",
+        "THREAD_UPDATE",
+        "THREAD_DELETE",
+        "THREAD_MEMBER_UPDATE",
+        "THREAD_MEMBERS_UPDATE",
+    )
+)
+
+
+def guild_key(event: GatewayEvent) -> Optional[Hashable]:
+    """Order events by the guild they belong to."""
+
+    d = event.d
+    if not isinstance(d, dict):
+        return None
+    return d.get("id") if event.t in GUILD_EVENTS else d.get("guild_id")
+
+
+def channel_key(event: GatewayEvent) -> Optional[Hashable]:
+    """Order events by the channel they belong to, threads count as channels."""
+
+    d = event.d
+    if not isinstance(d, dict):
+        return None
+    return d.get("id") if event.t in CHANNEL_EVENTS else d.get("channel_id")
+
+
+class Scheduler:
+    def __init__(self, loop: AbstractEventLoop = None) -> None:
+        """The default dispatch scheduler, which runs every listener call as its own task.
+
+        Args:
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.loop = loop or get_event_loop()
+
+    async def submit(self, event: GatewayEvent, listeners: Sequence[Callable]) -> None:
+        """Schedule listeners to be called with an event.
+
+        Args:
+            event (GatewayEvent): The event to dispatch.
+            listeners (Sequence[Callable]): The listeners to call.
+        """
+
+        for listener in listeners:
+            self.loop.create_task(listener(event))
+
+    async def run(self, listener: Callable, event: GatewayEvent) -> None:
+        """Call a listener, reporting exceptions to the loop's exception handler instead of raising them."""
+
+        try:
+            await listener(event)
+        except Exception as e:
+            self.loop.call_exception_handler(
+                {
+                    "message": f"Unhandled exception in listener {getattr(listener, '__qualname__', listener)}",
+                    "exception": e,
+                }
+            )
+
+    def close(self) -> None:
+        """Stop any background tasks owned by the scheduler."""
+
+    @property
+    def stats(self) -> dict:
+        return {}
+
+
+class PoolScheduler(Scheduler):
+    def __init__(
+        self,
+        workers: int = 32,
+        max_in_flight: int = 1000,
+        *,
+        overflow: Overflow = "block",
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """A dispatch scheduler which runs listeners on a fixed pool of worker tasks.
+
+        When max_in_flight listener calls are queued or running, submit either blocks, which
+        pauses the shard's reader and so the websocket, or drops the call, depending on overflow.
+
+        Args:
+            workers (int, optional): The number of worker tasks. Defaults to 32.
+            max_in_flight (int, optional): The maximum number of queued and running calls. Defaults to 1000.
+            overflow (str, optional): What to do when the limit is reached, 'block' or 'drop'. Defaults to 'block'.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        super().__init__(loop)
+
+        if overflow not in ("block", "drop"):
+            raise ValueError("overflow must be one of 'block', 'drop'")
+
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.overflow = overflow
+
+        self.queue: Queue = None
+        self.slots: Semaphore = None
+        self.tasks: List[Task] = []
+
+        self.in_flight = 0
+        self.completed = 0
+        self.dropped = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+
+    def start(self) -> None:
+        """Start the worker tasks, this is done automatically on the first submit."""
+
+        self.queue = Queue()
+        self.slots = Semaphore(self.max_in_flight)
+        self.tasks = [self.loop.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def submit(self, event: GatewayEvent, listeners: Sequence[Callable]) -> None:
+        if not self.tasks:
+            self.start()
+
+        for listener in listeners:
+            if self.slots.locked():
+                if self.overflow == "drop":
+                    self.dropped += 1
+                    continue
+
+                self.stalls += 1
+                start = perf_counter()
+                await self.slots.acquire()
+                self.stall_time += perf_counter() - start
+            else:
+                await self.slots.acquire()
+
+            self.in_flight += 1
+            self.queue.put_nowait((listener, event))
+
+    async def worker(self) -> None:
+        while True:
+            listener, event = await self.queue.get()
+
+            try:
+                await self.run(listener, event)
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+                self.slots.release()
+
+    def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    @property
+    def depth(self) -> int:
+        """The number of listener calls waiting for a worker."""
+
+        return self.queue.qsize() if self.queue else 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "workers": len(self.tasks),
+            "depth": self.depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "stalls": self.stalls,
+            "stall_time": self.stall_time,
+        }
+
+
+class KeyedScheduler(Scheduler):
+    def __init__(self, key: KeyFunction = guild_key, *, loop: AbstractEventLoop = None) -> None:
+        """A dispatch scheduler which keeps events with the same key in order.
+
+        Events sharing a key are handled one at a time, in the order they were received, with all of an
+        event's listeners running concurrently. Events with different keys run concurrently, and events
+        the key function returns None for are dispatched immediately. Each key's queue is removed as soon
+        as it drains.
+
+        Args:
+            key (Callable, optional): A function returning the ordering key for an event. Defaults to guild_key.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        super().__init__(loop)
+
+        self.key = key
+        self.queues: Dict[Hashable, Deque[Tuple[GatewayEvent, Sequence[Callable]]]] = {}
+
+        self.max_depth = 0
+        self.completed = 0
+
+    async def submit(self, event: GatewayEvent, listeners: Sequence[Callable]) -> None:
+        key = self.key(event)
+
+        if key is None:
+            return await super().submit(event, listeners)
+
+        queue = self.queues.get(key)
+
+        if queue is None:
+            queue = self.queues[key] = deque()
+            queue.append((event, listeners))
+            self.loop.create_task(self.drain(key, queue))
+            return
+
+        queue.append((event, listeners))
+
+        if len(queue) > self.max_depth:
+            self.max_depth = len(queue)
+
+    async def drain(self, key: Hashable, queue: Deque[Tuple[GatewayEvent, Sequence[Callable]]]) -> None:
+        try:
+            while queue:
+                event, listeners = queue.popleft()
+
+                await gather(*(self.run(listener, event) for listener in listeners))
+                self.completed += 1
+        finally:
+            del self.queues[key]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "keys": len(self.queues),
+            "depth": sum(len(queue) for queue in self.queues.values()),
+            "max_depth": self.max_depth,
+            "completed": self.completed,
+        }
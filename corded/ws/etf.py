@@ -0,0 +1,319 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from struct import Struct
+from typing import Any, Callable, Dict
+from zlib import decompress
+
+try:
+    import erlpack
+except ImportError:
+    erlpack = None
+
+# Built once, the decoder returns binaries as strings, matching the pure Python decoder
+erlpack_loads = erlpack.ErlangTermDecoder(encoding="utf-8").loads if erlpack else None
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+MAP_EXT = 116
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+U16 = Struct(">H")
+U32 = Struct(">I")
+I32 = Struct(">i")
+F64 = Struct(">d")
+
+ATOMS = {"nil": None, "null": None, "true": True, "false": False}
+
+
+class ETFError(ValueError):
+    pass
+
+
+class Decoder:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        """A decoder for Erlang External Term Format payloads.
+
+        Args:
+            data (bytes): The data to decode.
+            offset (int, optional): The offset the term starts at. Defaults to 0.
+        """
+
+        self.data = data
+        self.offset = offset
+
+    def decode(self) -> Any:
+        data = self.data
+        tag = data[self.offset]
+        self.offset += 1
+
+        try:
+            handler = HANDLERS[tag]
+        except KeyError:
+            raise ETFError(f"Unknown ETF tag {tag} at offset {self.offset - 1}") from None
+
+        return handler(self)
+
+    def read_u8(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def read_u16(self) -> int:
+        value = U16.unpack_from(self.data, self.offset)[0]
+        self.offset += 2
+        return value
+
+    def read_u32(self) -> int:
+        value = U32.unpack_from(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def read_str(self, length: int) -> str:
+        start = self.offset
+        self.offset += length
+        return str(self.data[start:self.offset], "utf-8")
+
+    def atom(self, name: str) -> Any:
+        return ATOMS.get(name, name)
+
+    def small_integer_ext(self) -> int:
+        return self.read_u8()
+
+    def integer_ext(self) -> int:
+        value = I32.unpack_from(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def new_float_ext(self) -> float:
+        value = F64.unpack_from(self.data, self.offset)[0]
+        self.offset += 8
+        return value
+
+    def float_ext(self) -> float:
+        start = self.offset
+        self.offset += 31
+        return float(self.data[start:self.offset].rstrip(b"\x00"))
+
+    def atom_ext(self) -> Any:
+        return self.atom(self.read_str(self.read_u16()))
+
+    def small_atom_ext(self) -> Any:
+        return self.atom(self.read_str(self.read_u8()))
+
+    def small_tuple_ext(self) -> list:
+        return [self.decode() for _ in range(self.read_u8())]
+
+    def large_tuple_ext(self) -> list:
+        return [self.decode() for _ in range(self.read_u32())]
+
+    def nil_ext(self) -> list:
+        return []
+
+    def string_ext(self) -> list:
+        # Erlang strings are lists of bytes, Discord only produces them for short integer lists
+        start = self.offset + 2
+        self.offset = start + U16.unpack_from(self.data, start - 2)[0]
+        return list(self.data[start:self.offset])
+
+    def list_ext(self) -> list:
+        items = [self.decode() for _ in range(self.read_u32())]
+
+        # Proper lists end with NIL_EXT, which is consumed and discarded here
+        self.decode()
+
+        return items
+
+    def binary_ext(self) -> str:
+        return self.read_str(self.read_u32())
+
+    def big(self, length: int) -> int:
+        sign = self.read_u8()
+        start = self.offset
+        self.offset += length
+        value = int.from_bytes(self.data[start:self.offset], "little")
+        return -value if sign else value
+
+    def small_big_ext(self) -> int:
+        return self.big(self.read_u8())
+
+    def large_big_ext(self) -> int:
+        return self.big(self.read_u32())
+
+    def map_ext(self) -> dict:
+        decode = self.decode
+        return {decode(): decode() for _ in range(self.read_u32())}
+
+    def compressed(self) -> Any:
+        size = self.read_u32()
+        data = decompress(self.data[self.offset:], bufsize=size)
+        self.offset = len(self.data)
+        return Decoder(data).decode()
+
+
+HANDLERS: Dict[int, Callable[[Decoder], Any]] = {
+    NEW_FLOAT_EXT: Decoder.new_float_ext,
+    COMPRESSED: Decoder.compressed,
+    SMALL_INTEGER_EXT: Decoder.small_integer_ext,
+    INTEGER_EXT: Decoder.integer_ext,
+    FLOAT_EXT: Decoder.float_ext,
+    ATOM_EXT: Decoder.atom_ext,
+    SMALL_TUPLE_EXT: Decoder.small_tuple_ext,
+    LARGE_TUPLE_EXT: Decoder.large_tuple_ext,
+    NIL_EXT: Decoder.nil_ext,
+    STRING_EXT: Decoder.string_ext,
+    LIST_EXT: Decoder.list_ext,
+    BINARY_EXT: Decoder.binary_ext,
+    SMALL_BIG_EXT: Decoder.small_big_ext,
+    LARGE_BIG_EXT: Decoder.large_big_ext,
+    SMALL_ATOM_EXT: Decoder.small_atom_ext,
+    MAP_EXT: Decoder.map_ext,
+    ATOM_UTF8_EXT: Decoder.atom_ext,
+    SMALL_ATOM_UTF8_EXT: Decoder.small_atom_ext,
+}
+
+
+def encode_atom(name: str, buffer: bytearray) -> None:
+    encoded = name.encode("utf-8")
+    buffer.append(SMALL_ATOM_UTF8_EXT)
+    buffer.append(len(encoded))
+    buffer += encoded
+
+
+def encode_term(obj: Any, buffer: bytearray) -> None:
+    if obj is None:
+        encode_atom("nil", buffer)
+    elif obj is True:
+        encode_atom("true", buffer)
+    elif obj is False:
+        encode_atom("false", buffer)
+    elif isinstance(obj, int):
+        obj = int(obj)
+        if 0 <= obj <= 255:
+            buffer.append(SMALL_INTEGER_EXT)
+            buffer.append(obj)
+        elif -(2 ** 31) <= obj < 2 ** 31:
+            buffer.append(INTEGER_EXT)
+            buffer += I32.pack(obj)
+        else:
+            magnitude = abs(obj)
+            digits = magnitude.to_bytes((magnitude.bit_length() + 7) // 8, "little")
+            if len(digits) > 255:
+                raise ETFError("Integer is too large to encode")
+            buffer.append(SMALL_BIG_EXT)
+            buffer.append(len(digits))
+            buffer.append(obj < 0)
+            buffer += digits
+    elif isinstance(obj, float):
+        buffer.append(NEW_FLOAT_EXT)
+        buffer += F64.pack(obj)
+    elif isinstance(obj, (str, bytes, bytearray)):
+        if isinstance(obj, str):
+            obj = obj.encode("utf-8")
+        buffer.append(BINARY_EXT)
+        buffer += U32.pack(len(obj))
+        buffer += obj
+    elif isinstance(obj, dict):
+        buffer.append(MAP_EXT)
+        buffer += U32.pack(len(obj))
+        for key, value in obj.items():
+            encode_term(key, buffer)
+            encode_term(value, buffer)
+    elif isinstance(obj, (list, tuple)):
+        if obj:
+            buffer.append(LIST_EXT)
+            buffer += U32.pack(len(obj))
+            for item in obj:
+                encode_term(item, buffer)
+        buffer.append(NIL_EXT)
+    else:
+        raise ETFError(f"Cannot encode object of type {obj.__class__.__qualname__}")
+
+
+def py_loads(data: bytes) -> Any:
+    """Decode an ETF payload using the pure Python decoder.
+
+    Args:
+        data (bytes): The payload to decode.
+    """
+
+    if not data or data[0] != FORMAT_VERSION:
+        raise ETFError("Payload does not start with the ETF version byte")
+
+    return Decoder(data, 1).decode()
+
+
+def py_dumps(obj: Any) -> bytes:
+    """Encode an object as an ETF payload using the pure Python encoder.
+
+    Args:
+        obj (Any): The object to encode.
+    """
+
+    buffer = bytearray((FORMAT_VERSION,))
+    encode_term(obj, buffer)
+    return bytes(buffer)
+
+
+def loads(data: bytes) -> Any:
+    """Decode an ETF payload, using erlpack if it is installed.
+
+    Args:
+        data (bytes): The payload to decode.
+    """
+
+    if erlpack_loads:
+        return erlpack_loads(bytes(data))
+    return py_loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as an ETF payload, using erlpack if it is installed.
+
+    Args:
+        obj (Any): The object to encode.
+    """
+
+    if erlpack:
+        return erlpack.pack(obj)
+    return py_dumps(obj)
@@ -0,0 +1,132 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractServer, TimeoutError, gather, open_unix_connection, start_unix_server, wait_for
+from dataclasses import asdict
+from json import dumps, loads
+from logging import getLogger
+from os import unlink
+from typing import Dict
+
+import corded
+
+from .session import SessionState
+from .shard import STOP_TIMEOUT
+
+log = getLogger(__name__)
+
+# Stopping shards takes at most aiohttp's 10s websocket close timeout plus STOP_TIMEOUT for the reader. Waiting well
+# beyond that means the new process never gives up on a handoff the old process goes on to complete.
+HANDOFF_TIMEOUT = 3 * (10 + STOP_TIMEOUT)
+
+
+async def serve_handoff(gateway: "corded.ws.GatewayClient", path: str) -> AbstractServer:
+    """Serve this process's shards to a process taking over from it, over a unix socket.
+
+    A request is one line of JSON with the shard IDs and shard count the new process runs. Each requested shard is
+    stopped with a resumable close code once its reader has dispatched everything it received, and its session is
+    sent back as one line of JSON. The new process resumes from that sequence, so events are neither lost nor
+    dispatched twice. If the reply can't be sent the shards are started again here.
+
+    Args:
+        gateway (corded.ws.GatewayClient): The gateway client to hand shards off from.
+        path (str): The path of the socket.
+    """
+
+    async def handle(reader, writer) -> None:
+        try:
+            request = loads(await reader.readline())
+
+            if request["shard_count"] != gateway.shard_count:
+                writer.write(dumps({"sessions": {}}).encode() + b"\n")
+                await writer.drain()
+                return
+
+            shard_ids = set(request["shard_ids"])
+            shards = [shard for shard in gateway.shards if shard.id in shard_ids and not shard.handed_off]
+            states = await gather(*(shard.stop() for shard in shards))
+
+            try:
+                sessions = {shard.id: asdict(state) if state else None for shard, state in zip(shards, states)}
+                writer.write(dumps({"sessions": sessions}).encode() + b"\n")
+                await writer.drain()
+            except Exception:
+                for shard in shards:
+                    shard.start()
+                raise
+
+            for shard in shards:
+                shard.handed_off = True
+
+            log.info("Handed off shards %s", [shard.id for shard in shards])
+        except Exception:
+            log.exception("Failed to hand off shards")
+        finally:
+            writer.close()
+
+        if all(shard.handed_off for shard in gateway.shards):
+            gateway.closed.set()
+
+    # The socket file of a process which already handed off is left behind
+    try:
+        unlink(path)
+    except FileNotFoundError:
+        pass
+
+    return await start_unix_server(handle, path)
+
+
+async def request_handoff(
+    gateway: "corded.ws.GatewayClient", path: str, *, timeout: float = HANDOFF_TIMEOUT
+) -> Dict[int, SessionState]:
+    """Take over shards from the process serving them on a unix socket.
+
+    Args:
+        gateway (corded.ws.GatewayClient): The gateway client taking the shards over.
+        path (str): The path of the socket.
+        timeout (float, optional): Seconds to wait for the other process. Defaults to HANDOFF_TIMEOUT.
+
+    Returns:
+        Dict[int, SessionState]: The sessions of the handed off shards, empty if no process is serving the socket.
+    """
+
+    try:
+        reader, writer = await wait_for(open_unix_connection(path), timeout)
+    except (OSError, TimeoutError):
+        return {}
+
+    try:
+        request = {"shard_ids": gateway.shard_ids, "shard_count": gateway.shard_count}
+        writer.write(dumps(request).encode() + b"\n")
+        await writer.drain()
+
+        response = loads(await wait_for(reader.readline(), timeout))
+    except (OSError, TimeoutError, ValueError) as e:
+        log.warning("Failed to take over shards: %s", e)
+        return {}
+    finally:
+        writer.close()
+
+    return {int(shard_id): SessionState(**state) for shard_id, state in response["sessions"].items() if state}
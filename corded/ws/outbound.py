@@ -0,0 +1,246 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, Event, Future, Task, get_event_loop, sleep
+from collections import deque
+from heapq import heappop, heappush
+from time import time
+from typing import Any, Deque, Dict, Hashable, List, Optional
+
+import corded
+from corded.http.ratelimiter import Priority
+from corded.objects.constants import GatewayOps
+
+# Sent straight away, with budget kept back for them, whether or not the session is ready
+CRITICAL_OPS = {GatewayOps.HEARTBEAT, GatewayOps.IDENTIFY, GatewayOps.RESUME}
+
+OP_PRIORITIES = {
+    GatewayOps.VOICE_STATE_UPDATE: Priority.HIGH,
+    GatewayOps.REQUEST_GUILD_MEMBERS: Priority.NORMAL,
+    GatewayOps.PRESENCE_UPDATE: Priority.LOW,
+}
+
+
+def coalesce_key(data: dict) -> Optional[Hashable]:
+    """Get the key of payloads which supersede each other, or None if a payload can't be superseded.
+
+    Args:
+        data (dict): The payload.
+    """
+
+    op = data["op"]
+
+    if op == GatewayOps.PRESENCE_UPDATE:
+        return op
+    if op == GatewayOps.VOICE_STATE_UPDATE:
+        return op, data["d"].get("guild_id")
+    return None
+
+
+class Outbound:
+    __slots__ = ("priority", "seq", "data", "key", "futures", "queued_at")
+
+    def __init__(self, priority: int, seq: int, data: dict, key: Optional[Hashable], future: Future) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.data = data
+        self.key = key
+        self.futures: List[Future] = [future]
+        self.queued_at = time()
+
+    def __lt__(self, other: "Outbound") -> bool:
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
+
+class SendQueue:
+    def __init__(
+        self,
+        shard: "corded.ws.Shard",
+        rate: int = 120,
+        per: float = 60,
+        *,
+        reserved: int = 5,
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """A shard's outbound queue, sending payloads by priority within the gateway's send limit.
+
+        Heartbeats, identifies and resumes skip the queue and can use the whole budget, everything else is limited
+        to rate - reserved sends per window and waits until the session is ready. A queued presence update is
+        replaced by a newer one, and so is a queued voice state update for the same guild.
+
+        Args:
+            shard (corded.ws.Shard): The shard to send with.
+            rate (int, optional): How many payloads can be sent per window. Defaults to 120.
+            per (float, optional): The window in seconds. Defaults to 60.
+            reserved (int, optional): How many sends per window are kept for critical payloads. Defaults to 5.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.shard = shard
+        self.rate = rate
+        self.per = per
+        self.reserved = reserved
+        self.loop = loop or get_event_loop()
+
+        self.sent_at: Deque[float] = deque()
+        self.heap: List[Outbound] = []
+        self.pending: Dict[Hashable, Outbound] = {}
+        self.seq = 0
+
+        self.ready = Event()
+        self.wake = Event()
+        self.worker: Task = None
+
+        self.sent = 0
+        self.critical = 0
+        self.coalesced = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def delay(self, limit: int) -> float:
+        """Get how long until a send is allowed with a given limit per window.
+
+        Args:
+            limit (int): How many sends are allowed per window.
+        """
+
+        now = time()
+        while self.sent_at and self.sent_at[0] <= now - self.per:
+            self.sent_at.popleft()
+
+        if len(self.sent_at) < limit:
+            return 0
+        return self.sent_at[-limit] + self.per - now
+
+    async def put(self, data: dict) -> None:
+        """Send a payload, returning once it has been sent or superseded.
+
+        Args:
+            data (dict): The payload.
+        """
+
+        if data["op"] in CRITICAL_OPS:
+            while delay := self.delay(self.rate):
+                await sleep(delay)
+
+            self.sent_at.append(time())
+            self.critical += 1
+            return await self.shard.write(data)
+
+        future = self.loop.create_future()
+        key = coalesce_key(data)
+
+        if key is not None and key in self.pending:
+            entry = self.pending[key]
+            entry.data = data
+            entry.futures.append(future)
+            self.coalesced += 1
+        else:
+            self.seq += 1
+            entry = Outbound(OP_PRIORITIES.get(data["op"], Priority.NORMAL), self.seq, data, key, future)
+            heappush(self.heap, entry)
+
+            if key is not None:
+                self.pending[key] = entry
+
+        if not self.worker or self.worker.done():
+            self.worker = self.loop.create_task(self.run())
+        self.wake.set()
+
+        await future
+
+    async def run(self) -> None:
+        while True:
+            await self.ready.wait()
+
+            if not self.heap:
+                self.wake.clear()
+                await self.wake.wait()
+                continue
+
+            if delay := self.delay(self.rate - self.reserved):
+                await sleep(delay)
+                continue
+
+            entry = heappop(self.heap)
+            if entry.key is not None:
+                del self.pending[entry.key]
+
+            waited = time() - entry.queued_at
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+            self.sent_at.append(time())
+
+            try:
+                await self.shard.write(entry.data)
+            except Exception as e:
+                for future in entry.futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.sent += 1
+            for future in entry.futures:
+                if not future.done():
+                    future.set_result(None)
+
+    def open(self) -> None:
+        """Start sending queued payloads, once the session is ready."""
+
+        self.ready.set()
+
+    def pause(self) -> None:
+        """Hold queued payloads while a new connection is set up, its send limit starts from zero."""
+
+        self.ready.clear()
+        self.sent_at.clear()
+
+    def close(self) -> None:
+        """Stop sending and fail everything still queued."""
+
+        self.pause()
+
+        if self.worker:
+            self.worker.cancel()
+
+        for entry in self.heap:
+            for future in entry.futures:
+                if not future.done():
+                    future.set_exception(ConnectionError("The shard was stopped before the payload was sent"))
+
+        self.heap.clear()
+        self.pending.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self.heap),
+            "sent": self.sent,
+            "critical": self.critical,
+            "coalesced": self.coalesced,
+            "wait_time": self.wait_time,
+            "max_wait": self.max_wait,
+            "budget": self.rate - len(self.sent_at),
+        }
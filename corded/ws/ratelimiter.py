@@ -22,7 +22,14 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from asyncio import AbstractEventLoop, Semaphore
+from asyncio import AbstractEventLoop, Semaphore, get_event_loop, sleep
+from collections import Counter
+from time import time
+from typing import Iterable, List
+
+from corded.objects.partials import SessionStartLimit
+
+IDENTIFY_INTERVAL = 5
 
 
 class Ratelimiter:
@@ -43,3 +50,134 @@ class Ratelimiter:
         await self.lock.acquire()
 
         self.loop.call_later(self.per, self.lock.release)
+
+
+class IdentifyScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        *,
+        remaining: int = None,
+        total: int = None,
+        reset_after: float = 0,
+        interval: float = IDENTIFY_INTERVAL,
+        loop: AbstractEventLoop = None,
+    ) -> None:
+        """Schedules identifies the way Discord limits them.
+
+        Shards identify in parallel across identify buckets (shard_id % max_concurrency), and one at a time every
+        interval seconds within a bucket. Each identify takes one session start from the remaining budget, and once
+        it's used up identifies wait for the budget to reset.
+
+        Args:
+            max_concurrency (int, optional): The number of identify buckets. Defaults to 1.
+            remaining (int, optional): The number of session starts left. Defaults to unlimited.
+            total (int, optional): The number of session starts the budget resets to. Defaults to remaining.
+            reset_after (float, optional): Seconds until the budget resets. Defaults to 0.
+            interval (float, optional): Seconds between identifies in one bucket. Defaults to 5.
+        """
+
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self.loop = loop or get_event_loop()
+
+        self.remaining = remaining
+        self.total = total if total is not None else remaining
+        self.reset_at = time() + reset_after
+
+        self.slots: List[float] = [0.0] * max_concurrency
+
+        self.identified = 0
+        self.waited = 0.0
+        # How many identifies had to wait for the session start budget to reset
+        self.budget_waits = 0
+
+    @classmethod
+    def from_limit(cls, limit: SessionStartLimit, **kwargs) -> "IdentifyScheduler":
+        """Create a scheduler from the session start limit returned by /gateway/bot.
+
+        Args:
+            limit (SessionStartLimit): The session start limit.
+        """
+
+        return cls(
+            limit.max_concurrency,
+            remaining=limit.remaining,
+            total=limit.total,
+            reset_after=limit.reset_after / 1000,
+            **kwargs,
+        )
+
+    def reserve(self, shard_id: int) -> float:
+        """Reserve the next identify slot for a shard, and return the time it's at.
+
+        Args:
+            shard_id (int): The ID of the shard which is going to identify.
+        """
+
+        now = time()
+        bucket = shard_id % self.max_concurrency
+        at = max(now, self.slots[bucket])
+
+        if self.remaining is not None:
+            if self.reset_at <= at:
+                self.remaining = self.total
+                self.reset_at = at + 24 * 60 * 60
+
+            if self.remaining <= 0:
+                self.budget_waits += 1
+                at = self.reset_at
+                self.remaining = self.total
+                self.reset_at = at + 24 * 60 * 60
+
+            self.remaining -= 1
+
+        self.slots[bucket] = at + self.interval
+
+        return at
+
+    async def acquire(self, shard_id: int) -> None:
+        """Wait until a shard is allowed to identify.
+
+        Args:
+            shard_id (int): The ID of the shard which is about to identify.
+        """
+
+        delay = self.reserve(shard_id) - time()
+        self.identified += 1
+
+        if delay > 0:
+            self.waited += delay
+            await sleep(delay)
+
+    def predict(self, shard_ids: Iterable[int]) -> float:
+        """Predict how many seconds it will take for the given shards to identify, if none have yet.
+
+        Args:
+            shard_ids (Iterable[int]): The IDs of the shards which are going to identify.
+        """
+
+        now = time()
+        per_bucket = Counter(shard_id % self.max_concurrency for shard_id in shard_ids)
+
+        if not per_bucket:
+            return 0.0
+
+        eta = max(
+            max(now, self.slots[bucket]) + (count - 1) * self.interval for bucket, count in per_bucket.items()
+        )
+
+        if self.remaining is not None and sum(per_bucket.values()) > self.remaining:
+            eta = max(eta, self.reset_at)
+
+        return eta - now
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "identified": self.identified,
+            "waited": self.waited,
+            "remaining": self.remaining,
+            "budget_waits": self.budget_waits,
+            "reset_after": max(0.0, self.reset_at - time()),
+        }
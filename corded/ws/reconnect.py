@@ -0,0 +1,158 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, Semaphore, get_event_loop, sleep
+from dataclasses import asdict, dataclass
+from random import uniform
+from time import time
+from typing import Dict, Optional
+
+import corded
+
+
+@dataclass
+class ReconnectStats:
+    connects: int = 0
+    failures: int = 0
+    resumes: int = 0
+    identifies: int = 0
+    last_delay: float = 0.0
+    downtime: float = 0.0
+    disconnected_at: Optional[float] = None
+    last_close_code: Optional[int] = None
+    ready: bool = False
+
+
+class ReconnectCoordinator:
+    def __init__(
+        self, *, base: float = 1, cap: float = 60, max_concurrent: int = 16, loop: AbstractEventLoop = None
+    ) -> None:
+        """Paces shard reconnects, shared by every shard of a GatewayClient.
+
+        Reconnects wait a random delay between 0 and base * 2 ** failures (capped), so shards which dropped at
+        the same moment spread out instead of reconnecting together. A shard's failures reset once it receives
+        READY or RESUMED, a connection which closes before then counts as a failure. At most max_concurrent shards
+        open a connection at once. Shards with a session resume, everything else goes through the identify limiter.
+
+        Args:
+            base (float, optional): The backoff after the first failure in seconds. Defaults to 1.
+            cap (float, optional): The maximum backoff in seconds. Defaults to 60.
+            max_concurrent (int, optional): How many shards can open a connection at once. Defaults to 16.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.base = base
+        self.cap = cap
+        self.loop = loop or get_event_loop()
+
+        self.connecting = Semaphore(max_concurrent)
+        self.shards: Dict[int, ReconnectStats] = {}
+
+    def get_stats(self, shard: "corded.ws.Shard") -> ReconnectStats:
+        if shard.id not in self.shards:
+            self.shards[shard.id] = ReconnectStats()
+
+        return self.shards[shard.id]
+
+    def backoff(self, failures: int) -> float:
+        """Get a jittered delay for a number of failures.
+
+        Args:
+            failures (int): How many times in a row the shard failed to reconnect.
+        """
+
+        return uniform(0, min(self.cap, self.base * 2 ** failures))
+
+    async def wait(self, shard: "corded.ws.Shard") -> None:
+        """Wait before a shard connects, no wait is needed the first time.
+
+        Args:
+            shard (corded.ws.Shard): The shard which is about to connect.
+        """
+
+        stats = self.get_stats(shard)
+        stats.ready = False
+
+        if not stats.connects and not stats.failures:
+            return
+
+        stats.last_delay = self.backoff(stats.failures)
+        await sleep(stats.last_delay)
+
+    def failed(self, shard: "corded.ws.Shard") -> None:
+        """Record a failed connection attempt.
+
+        Args:
+            shard (corded.ws.Shard): The shard which failed to connect.
+        """
+
+        stats = self.get_stats(shard)
+        stats.failures += 1
+
+        if stats.disconnected_at is None:
+            stats.disconnected_at = time()
+
+    def disconnected(self, shard: "corded.ws.Shard", code: Optional[int]) -> None:
+        """Record a shard's connection closing.
+
+        Args:
+            shard (corded.ws.Shard): The shard which disconnected.
+            code (Optional[int]): The close code.
+        """
+
+        stats = self.get_stats(shard)
+        stats.last_close_code = code
+
+        if not stats.ready:
+            stats.failures += 1
+
+        if stats.disconnected_at is None:
+            stats.disconnected_at = time()
+
+    def ready(self, shard: "corded.ws.Shard", *, resumed: bool) -> None:
+        """Record a shard's session becoming ready again, resetting its failures.
+
+        Args:
+            shard (corded.ws.Shard): The shard which received READY or RESUMED.
+            resumed (bool): Whether the session was resumed rather than identified.
+        """
+
+        stats = self.get_stats(shard)
+        stats.connects += 1
+        stats.failures = 0
+        stats.ready = True
+
+        if resumed:
+            stats.resumes += 1
+        else:
+            stats.identifies += 1
+
+        if stats.disconnected_at is not None:
+            stats.downtime += time() - stats.disconnected_at
+            stats.disconnected_at = None
+
+    @property
+    def stats(self) -> Dict[int, dict]:
+        return {shard_id: asdict(stats) for shard_id, stats in self.shards.items()}
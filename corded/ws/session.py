@@ -0,0 +1,126 @@
+"""
+MIT License
+
+Copyright (c) 2021 vcokltfre
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from asyncio import AbstractEventLoop, get_event_loop
+from dataclasses import asdict, dataclass
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+@dataclass
+class SessionState:
+    session_id: str
+    seq: Optional[int]
+    resume_url: Optional[str]
+    shard_count: int
+
+
+class SessionStore:
+    """A place to keep gateway sessions between restarts, so shards can resume instead of identifying.
+
+    Subclasses implement load and save, this base class keeps nothing.
+    """
+
+    async def load(self, shard_id: int) -> Optional[SessionState]:
+        """Load the saved session of a shard.
+
+        Args:
+            shard_id (int): The ID of the shard.
+        """
+
+        return None
+
+    async def save(self, states: Dict[int, Optional[SessionState]]) -> None:
+        """Save the sessions of several shards, a state of None removes the shard's saved session.
+
+        Args:
+            states (Dict[int, Optional[SessionState]]): Shard IDs mapped to their sessions.
+        """
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self) -> None:
+        """A session store which keeps sessions in memory, for restarting a client within one process."""
+
+        self.states: Dict[int, SessionState] = {}
+
+    async def load(self, shard_id: int) -> Optional[SessionState]:
+        return self.states.get(shard_id)
+
+    async def save(self, states: Dict[int, Optional[SessionState]]) -> None:
+        for shard_id, state in states.items():
+            if state:
+                self.states[shard_id] = state
+            else:
+                self.states.pop(shard_id, None)
+
+
+class FileSessionStore(SessionStore):
+    def __init__(self, path: Union[str, Path], *, loop: AbstractEventLoop = None) -> None:
+        """A session store which keeps sessions in a JSON file.
+
+        The file is replaced atomically on each save, so a crash mid-save leaves the previous sessions intact.
+
+        Args:
+            path (Union[str, Path]): The path of the file.
+            loop (AbstractEventLoop, optional): The event loop to use. Defaults to the result of asyncio.get_event_loop.
+        """
+
+        self.path = Path(path)
+        self.loop = loop or get_event_loop()
+        self.states: Optional[Dict[int, SessionState]] = None
+
+    def read(self) -> Dict[int, SessionState]:
+        try:
+            data = loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+        return {int(shard_id): SessionState(**state) for shard_id, state in data.items()}
+
+    def write(self, states: Dict[int, SessionState]) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(dumps({shard_id: asdict(state) for shard_id, state in states.items()}))
+        replace(tmp, self.path)
+
+    async def load(self, shard_id: int) -> Optional[SessionState]:
+        if self.states is None:
+            self.states = await self.loop.run_in_executor(None, self.read)
+
+        return self.states.get(shard_id)
+
+    async def save(self, states: Dict[int, Optional[SessionState]]) -> None:
+        if self.states is None:
+            self.states = await self.loop.run_in_executor(None, self.read)
+
+        for shard_id, state in states.items():
+            if state:
+                self.states[shard_id] = state
+            else:
+                self.states.pop(shard_id, None)
+
+        await self.loop.run_in_executor(None, self.write, dict(self.states))
@@ -22,17 +22,29 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from asyncio import AbstractEventLoop, Task, sleep
+from asyncio import AbstractEventLoop, CancelledError, Task, TimeoutError, sleep, wait_for
 from sys import platform
 from time import time
+from typing import Any, Optional
+from zlib import decompressobj
 
-from aiohttp import WSMessage, WSMsgType
+from aiohttp import ClientWebSocketResponse, WSMessage, WSMsgType
 
 import corded
 from corded.objects.constants import GatewayCloseCodes as CloseCodes
 from corded.objects.constants import GatewayOps
 
-from .ratelimiter import Ratelimiter
+from . import etf
+from .outbound import SendQueue
+from .session import SessionState
+
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+# aiohttp 3.11+ can send encoded text frames, so codec output doesn't have to be decoded only to be encoded again
+SEND_FRAME = hasattr(ClientWebSocketResponse, "send_frame")
+
+# The longest Shard.stop waits for the reader to finish dispatching, on top of closing the websocket
+STOP_TIMEOUT = 10
 
 
 class Shard:
@@ -52,8 +64,11 @@ class Shard:
         self.url = None
         self.ws = None
 
+        self.inflator = None
+        self.buffer = bytearray()
+
         self.session = None
-        self.seq = None
+        self.resume_url = None
         self.ws_seq = None
 
         self.heartbeat_task = None
@@ -63,68 +78,155 @@ class Shard:
 
         self.pacemaker: Task = None
 
-        self.send_limiter = Ratelimiter(120, 60, self.loop)
+        # The task running connect, and whether it should stop instead of reconnecting
+        self.task: Task = None
+        self.stopped = False
+        self.handed_off = False
+        self.reading = False
+
+        self.outbound = SendQueue(self, loop=self.loop)
 
     def __repr__(self) -> str:
-        return f"<Shard id={self.id} seq={self.seq}>"
+        return f"<Shard id={self.id} seq={self.ws_seq}>"
 
     async def spawn_ws(self) -> None:
         """Spawn the websocket connection to the gateway."""
 
-        self.ws = await self.parent.http.spawn_ws(self.url)
+        compress = self.parent.compress
+
+        # Queued payloads wait for the new session, and the send limit is per connection
+        self.outbound.pause()
+
+        # Each connection gets a fresh zlib context, the stream can't be continued across sockets
+        self.inflator = decompressobj() if compress else None
+        self.buffer.clear()
+
+        # Resumes have to connect to the URL given in READY
+        url = self.resume_url if self.session and self.resume_url else self.url
+
+        self.ws = await self.parent.http.spawn_ws(
+            url, compress=compress, encoding=self.parent.encoding
+        )
 
     async def connect(self) -> None:
         """Create a connection to the Discord gateway."""
 
-        if not self.url:
-            self.url = (await self.parent.http.get_gateway()).url
-
-        backoff = 0.1
+        reconnects = self.parent.reconnects
 
-        while True:
+        while not self.stopped:
             try:
-                await sleep(backoff)
-                await self.spawn_ws()
+                await reconnects.wait(self)
+
+                # The URL is dropped after a RATE_LIMITED close, so it's fetched again before reconnecting
+                if not self.url:
+                    self.url = (await self.parent.http.get_gateway()).url
+
+                # The identify slot is waited for before connecting, so the reader never blocks on it and heartbeats
+                # are acknowledged from the moment HELLO arrives
+                if not self.session and self.parent.identify_limiter:
+                    await self.parent.identify_limiter.acquire(self.id)
 
-                if self.session:
-                    await self.resume()
+                if self.stopped:
+                    break
 
-                backoff = 0.1
+                async with reconnects.connecting:
+                    await self.spawn_ws()
 
-                await self.start_reader()
+                if self.stopped:
+                    await self.close()
+                    break
+
+                self.reading = True
+                try:
+                    await self.start_reader()
+                finally:
+                    self.reading = False
             except Exception as e:
                 print(f"Shard {self.id} raised an exception during execution: {e}")
-                if backoff < 5:
-                    backoff *= 2
+                reconnects.failed(self)
+
+    def start(self) -> Task:
+        """Start connecting in a new task."""
+
+        self.stopped = False
+        self.task = self.loop.create_task(self.connect())
+
+        return self.task
+
+    async def stop(self, timeout: float = STOP_TIMEOUT) -> Optional[SessionState]:
+        """Close the connection without reconnecting, and return the session state to resume it with.
+
+        A connected reader finishes dispatching everything received before the close, so the returned sequence is the
+        last event this shard dispatched. A shard which isn't reading, e.g. waiting to reconnect or for an identify
+        slot, is cancelled straight away.
+
+        Args:
+            timeout (float, optional): The longest to wait for the reader to finish, after which it's cancelled.
+                Defaults to STOP_TIMEOUT.
+        """
+
+        self.stopped = True
+        reading = self.reading
 
-    async def close(self) -> None:
-        """Gracefully close the connection."""
+        await self.close()
+        self.outbound.close()
+
+        task = self.task
+        if task and not task.done():
+            if not reading:
+                task.cancel()
+
+            try:
+                await wait_for(task, timeout)
+            except (CancelledError, TimeoutError):
+                pass
+
+        return self.session_state()
+
+    async def close(self, code: int = 4000) -> None:
+        """Gracefully close the connection.
+
+        Args:
+            code (int, optional): The close code to use. Defaults to 4000, as closing with 1000 or 1001 invalidates
+                the session and prevents resuming.
+        """
 
         self.failed_heartbeats = 0
 
         if self.ws and not self.ws.closed:
-            await self.ws.close()
+            await self.ws.close(code=code)
 
         if self.pacemaker and not self.pacemaker.cancelled():
             self.pacemaker.cancel()
 
     async def send(self, data: dict) -> None:
-        """Send data to the gateway.
+        """Send data to the gateway through the shard's outbound queue, see SendQueue.
 
         Args:
             data (dict): The data to send.
         """
 
-        await self.send_limiter.wait()
+        await self.outbound.put(data)
+
+    async def write(self, data: dict) -> None:
+        """Write data to the websocket immediately, bypassing the outbound queue.
+
+        Args:
+            data (dict): The data to send.
+        """
 
-        self.loop.create_task(self.parent.dispatch_send(self, data))
-        try:
-            await self.ws.send_json(data)
-        except ConnectionResetError:
-            exit(1)
+        if self.parent.wants(data.get("t"), data["op"], "outbound"):
+            self.loop.create_task(self.parent.dispatch_send(self, data))
+        # A ConnectionResetError is left to the caller, the reader then sees the close and the shard reconnects
+        if self.parent.encoding == "etf":
+            await self.ws.send_bytes(etf.dumps(data))
+        elif SEND_FRAME:
+            await self.ws.send_frame(self.parent.codec.dumps(data), WSMsgType.TEXT)
+        else:
+            await self.ws.send_str(self.parent.codec.dumps(data).decode("utf-8"))
 
     async def identify(self) -> None:
-        """Sends an identfy payload to the gateway."""
+        """Sends an identfy payload to the gateway, the identify slot has already been waited for by connect."""
 
         await self.send(
             {
@@ -151,7 +253,7 @@ class Shard:
                 "d": {
                     "token": self.parent.http.token,
                     "session_id": self.session,
-                    "seq": self.seq,
+                    "seq": self.ws_seq,
                 },
             }
         )
@@ -161,25 +263,52 @@ class Shard:
 
         self.last_heartbeat_send = time()
 
-        await self.send({"op": GatewayOps.HEARTBEAT, "d": self.seq})
-
-        if self.seq:
-            self.seq += 1
-        else:
-            self.seq = 1
+        await self.send({"op": GatewayOps.HEARTBEAT, "d": self.ws_seq})
 
     async def dispatch(self, data: dict) -> None:
-        """Dispatch events."""
+        """Dispatch events.
 
-        await self.parent.dispatch_recv(self, data)
+        Control opcodes are handled before listeners see them, and their listeners run in a separate task, so a
+        full dispatch scheduler can never hold up HELLO, ACK, RECONNECT or INVALID_SESSION.
+        """
 
         op = data["op"]
 
+        if op == GatewayOps.DISPATCH:
+            t = data["t"]
+
+            if t == "READY":
+                self.session = data["d"]["session_id"]
+                self.resume_url = data["d"].get("resume_gateway_url")
+                self.parent.reconnects.ready(self, resumed=False)
+                self.outbound.open()
+            elif t == "RESUMED":
+                self.parent.reconnects.ready(self, resumed=True)
+                self.outbound.open()
+
+            # Only dispatches wait for the scheduler, which applies backpressure to the reader
+            return await self.parent.dispatch_recv(self, data)
+
+        if self.parent.wants(None, op, "inbound"):
+            self.loop.create_task(self.parent.dispatch_recv(self, data))
+
         if op == GatewayOps.HELLO:
+            self.recieved_ack = True
             self.pacemaker = self.loop.create_task(
                 self.start_pacemaker(data["d"]["heartbeat_interval"])
             )
-            await self.identify()
+
+            if self.session:
+                await self.resume()
+            else:
+                await self.identify()
+        elif op == GatewayOps.INVALID_SESSION:
+            if not data["d"]:
+                # Identifying again needs an identify slot, which connect waits for before reconnecting
+                self.invalidate()
+
+            # A resumable session is kept, so HELLO resumes once the reconnect coordinator's jittered wait is over
+            await self.close()
         elif op == GatewayOps.ACK:
             self.latency = time() - self.last_heartbeat_send
             self.recieved_ack = True
@@ -189,6 +318,8 @@ class Shard:
     async def handle_disconnect(self, code: int) -> None:
         """Handle the gateway disconnecting correctly."""
 
+        self.parent.reconnects.disconnected(self, code)
+
         if code in [
             CloseCodes.NOT_AUTHENTICATED,
             CloseCodes.AUTHENTICATION_FAILED,
@@ -203,15 +334,42 @@ class Shard:
             CloseCodes.RATE_LIMITED,
             CloseCodes.SESSION_TIMEOUT,
         ]:
-            self.session = None
+            self.invalidate()
 
             if code == CloseCodes.RATE_LIMITED:
                 self.url = None
 
-        self.seq = None
-
         await self.close()
 
+    def invalidate(self) -> None:
+        """Forget the current session, so the next connection identifies instead of resuming."""
+
+        self.session = None
+        self.resume_url = None
+        self.ws_seq = None
+
+    def session_state(self) -> Optional[SessionState]:
+        """Get the resumable state of the shard, or None if it has no session."""
+
+        if not self.session:
+            return None
+
+        return SessionState(self.session, self.ws_seq, self.resume_url, self.parent.shard_count)
+
+    def restore(self, state: SessionState) -> None:
+        """Restore a saved session, which the next connection resumes.
+
+        Args:
+            state (SessionState): The saved session.
+        """
+
+        if state.shard_count != self.parent.shard_count:
+            return
+
+        self.session = state.session_id
+        self.ws_seq = state.seq
+        self.resume_url = state.resume_url
+
     async def start_reader(self) -> None:
         """Start a loop constantly reading from the gateway."""
 
@@ -219,15 +377,61 @@ class Shard:
             message: WSMessage
 
             if message.type == WSMsgType.TEXT:
-                message_data = message.json()
+                message_data = self.parent.codec.loads(message.data)
+            elif message.type == WSMsgType.BINARY:
+                payload = self.inflate(message.data) if self.inflator else message.data
+
+                if payload is None:
+                    continue
 
-                if s := message_data.get("s"):
-                    self.ws_seq = s
+                message_data = self.decode(payload)
+            else:
+                continue
 
-                await self.dispatch(message_data)
+            if s := message_data.get("s"):
+                self.ws_seq = s
+
+            await self.dispatch(message_data)
 
         await self.handle_disconnect(self.ws.close_code)
 
+    def inflate(self, data: bytes) -> Optional[bytes]:
+        """Feed a zlib-stream frame into the decompressor.
+
+        Args:
+            data (bytes): The binary frame received from the gateway.
+
+        Returns:
+            Optional[bytes]: The decompressed message, or None if the message is incomplete.
+        """
+
+        buffer = self.buffer
+
+        if not buffer and data[-4:] == ZLIB_SUFFIX:
+            # Fast path: the whole message arrived in one frame, so skip the copy into the buffer
+            return self.inflator.decompress(data)
+
+        buffer.extend(data)
+
+        if len(buffer) < 4 or buffer[-4:] != ZLIB_SUFFIX:
+            return None
+
+        payload = self.inflator.decompress(buffer)
+        buffer.clear()
+
+        return payload
+
+    def decode(self, payload: bytes) -> Any:
+        """Decode a binary message using the gateway encoding.
+
+        Args:
+            payload (bytes): The message to decode.
+        """
+
+        if self.parent.encoding == "etf":
+            return etf.loads(payload)
+        return self.parent.codec.loads(payload)
+
     async def start_pacemaker(self, delay: float) -> None:
         """A loop to constantly heartbeat at an interval given by the gateway."""
 
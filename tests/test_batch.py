@@ -0,0 +1,116 @@
+from asyncio import get_running_loop, run, sleep
+from random import random
+
+import pytest
+
+from corded import HTTPClient, Route
+from corded.http.batch import Batch
+from corded.http.ratelimiter import Ratelimiter
+
+
+class HTTP:
+    def __init__(self, delay: float = 0.005) -> None:
+        self.ratelimiter = Ratelimiter(get_running_loop(), global_rate=None)
+        self.delay = delay
+
+        self.calls = []
+        self.running = set()
+        self.overlaps = 0
+
+    async def request(self, method: str, route: Route, **params) -> str:
+        if route.bucket in self.running:
+            self.overlaps += 1
+
+        self.running.add(route.bucket)
+        self.calls.append(route.route)
+
+        try:
+            await sleep(random() * self.delay)
+
+            if params.get("fail"):
+                raise ValueError(route.route)
+
+            return route.route
+        finally:
+            self.running.discard(route.bucket)
+
+
+def messages(channels: int, count: int) -> list:
+    route = "/channels/{channel_id}/messages/{message_id}"
+    return [
+        ("DELETE", Route(route, channel_id=channel, message_id=message), {})
+        for message in range(count)
+        for channel in range(channels)
+    ]
+
+
+def test_in_order_within_bucket() -> None:
+    async def test() -> None:
+        http = HTTP()
+        items = messages(4, 10)
+
+        results = [result async for result in Batch(http, items, concurrency=4)]
+
+        assert sorted(result.index for result in results) == list(range(len(items)))
+        assert all(result.ok and result.result == items[result.index][1].route for result in results)
+
+        # Requests in one bucket never overlap and start in the order they were given
+        assert not http.overlaps
+        for channel in range(4):
+            prefix = f"/channels/{channel}/"
+            expected = [route.route for _, route, _ in items if route.route.startswith(prefix)]
+            assert [call for call in http.calls if call.startswith(prefix)] == expected
+
+    run(test())
+
+
+def test_max_pending_bound() -> None:
+    async def test() -> None:
+        http = HTTP(delay=0)
+        pulled = []
+
+        def items():
+            for item in messages(100, 1):
+                pulled.append(item)
+                yield item
+
+        batch = Batch(http, items(), concurrency=10, max_pending=5)
+        received = 0
+
+        async for _ in batch:
+            received += 1
+
+            # Let the feeder run ahead as far as it can while the consumer is slow
+            await sleep(0.001)
+            assert len(pulled) - received <= 5
+
+        assert received == len(pulled) == 100
+
+    run(test())
+
+
+def test_errors() -> None:
+    async def test() -> None:
+        http = HTTP()
+        items = [("GET", Route("/users/@me"), {"fail": True}), ("GET", Route("/gateway"), {})]
+
+        results = [result async for result in Batch(http, items)]
+        assert sorted(result.ok for result in results) == [False, True]
+
+        with pytest.raises(ValueError):
+            async for _ in Batch(http, items, return_exceptions=False):
+                pass
+
+    run(test())
+
+
+def test_map_passes_options() -> None:
+    async def test() -> None:
+        http = HTTPClient("token", loop=get_running_loop())
+        batch = http.map("GET", [Route("/users/@me")], concurrency=2, max_pending=3, return_exceptions=False)
+
+        assert batch.concurrency == 2
+        assert batch.pending._value == 3
+        assert not batch.return_exceptions
+
+    run(test())
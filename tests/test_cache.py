@@ -0,0 +1,147 @@
+from asyncio import CancelledError, Event, get_running_loop, run, sleep
+
+import pytest
+
+from corded import Route
+from corded.http.cache import ResponseCache
+
+ROUTE = Route("/guilds/{guild_id}", guild_id=1)
+KEY = (ROUTE.route, None)
+
+
+class Upstream:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.started = Event()
+        self.done = Event()
+        self.cancelled = False
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        self.started.set()
+
+        try:
+            await self.done.wait()
+        except CancelledError:
+            self.cancelled = True
+            raise
+
+        return {"id": "1", "roles": []}
+
+
+def test_coalesces_in_flight_requests() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        cache = ResponseCache(loop=loop)
+        upstream = Upstream()
+
+        tasks = [loop.create_task(cache.fetch(KEY, ROUTE, upstream)) for _ in range(3)]
+        await upstream.started.wait()
+        upstream.done.set()
+
+        results = [await task for task in tasks]
+
+        assert upstream.calls == 1
+        assert cache.stats["coalesced"] == 2
+        assert all(result == {"id": "1", "roles": []} for result in results)
+
+        # Every caller gets its own copy, so mutating one result can't affect the others
+        assert len({id(result) for result in results}) == 3
+
+    run(test())
+
+
+def test_follower_survives_leader_cancellation() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        cache = ResponseCache(loop=loop)
+        upstream = Upstream()
+
+        leader = loop.create_task(cache.fetch(KEY, ROUTE, upstream))
+        await upstream.started.wait()
+        follower = loop.create_task(cache.fetch(KEY, ROUTE, upstream))
+        await sleep(0)
+
+        leader.cancel()
+        await sleep(0)
+        upstream.done.set()
+
+        assert await follower == {"id": "1", "roles": []}
+        with pytest.raises(CancelledError):
+            await leader
+
+        assert upstream.calls == 1
+        assert not upstream.cancelled
+
+    run(test())
+
+
+def test_cancels_upstream_once_abandoned() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        cache = ResponseCache(loop=loop)
+        upstream = Upstream()
+
+        tasks = [loop.create_task(cache.fetch(KEY, ROUTE, upstream)) for _ in range(2)]
+        await upstream.started.wait()
+
+        for task in tasks:
+            task.cancel()
+        await sleep(0)
+        await sleep(0)
+
+        assert upstream.cancelled
+        assert not cache.in_flight
+
+        # A later caller makes a new request instead of joining the cancelled one
+        upstream = Upstream()
+        upstream.done.set()
+        assert await cache.fetch(KEY, ROUTE, upstream) == {"id": "1", "roles": []}
+        assert upstream.calls == 1
+
+    run(test())
+
+
+def test_caches_with_ttl() -> None:
+    async def test() -> None:
+        cache = ResponseCache({"/guilds/{guild_id}": 0.05}, loop=get_running_loop())
+        upstream = Upstream()
+        upstream.done.set()
+
+        first = await cache.fetch(KEY, ROUTE, upstream)
+        first["roles"].append("2")
+
+        # Cached values are copies, so the caller's mutation isn't cached
+        assert await cache.fetch(KEY, ROUTE, upstream) == {"id": "1", "roles": []}
+        assert upstream.calls == 1
+        assert cache.stats["hits"] == 1
+
+        await sleep(0.06)
+        await cache.fetch(KEY, ROUTE, upstream)
+        assert upstream.calls == 2
+
+    run(test())
+
+
+def test_errors_are_shared_and_not_cached() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        cache = ResponseCache({"/guilds/{guild_id}": 30}, loop=loop)
+        calls = []
+
+        async def failing() -> None:
+            calls.append(None)
+            await sleep(0.01)
+            raise ValueError("upstream failed")
+
+        tasks = [loop.create_task(cache.fetch(KEY, ROUTE, failing)) for _ in range(2)]
+        for task in tasks:
+            with pytest.raises(ValueError):
+                await task
+
+        with pytest.raises(ValueError):
+            await cache.fetch(KEY, ROUTE, failing)
+
+        assert len(calls) == 2
+
+    run(test())
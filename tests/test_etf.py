@@ -0,0 +1,120 @@
+from struct import pack
+from zlib import compress
+
+import pytest
+
+from corded.ws import etf
+
+
+def term(tag: int, body: bytes) -> bytes:
+    return bytes((etf.FORMAT_VERSION, tag)) + body
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        False,
+        0,
+        255,
+        256,
+        -1,
+        2 ** 31 - 1,
+        -(2 ** 31),
+        1.5,
+        -0.25,
+        "",
+        "hello",
+        "snowman ☃",
+        [],
+        [1, "two", None],
+        {},
+        {"a": 1, "b": [{"c": "d"}]},
+    ],
+)
+def test_roundtrip(value) -> None:
+    assert etf.py_loads(etf.py_dumps(value)) == value
+
+
+@pytest.mark.parametrize(
+    "snowflake",
+    [881234567890123456, 2 ** 63 - 1, 2 ** 64 + 5, -881234567890123456, -(2 ** 40)],
+)
+def test_roundtrip_big_ints(snowflake: int) -> None:
+    payload = {"id": snowflake, "ids": [snowflake, snowflake + 1]}
+    assert etf.py_loads(etf.py_dumps(payload)) == payload
+
+
+def test_bytes_and_tuples_decode_as_str_and_list() -> None:
+    assert etf.py_loads(etf.py_dumps(b"raw")) == "raw"
+    assert etf.py_loads(etf.py_dumps((1, 2))) == [1, 2]
+
+
+def test_string_ext() -> None:
+    assert etf.py_loads(term(etf.STRING_EXT, pack(">H", 3) + bytes((1, 2, 200)))) == [1, 2, 200]
+
+
+def test_atoms() -> None:
+    assert etf.py_loads(term(etf.ATOM_EXT, pack(">H", 4) + b"true")) is True
+    assert etf.py_loads(term(etf.SMALL_ATOM_EXT, bytes((3,)) + b"nil")) is None
+    assert etf.py_loads(term(etf.ATOM_UTF8_EXT, pack(">H", 5) + b"false")) is False
+    assert etf.py_loads(term(etf.SMALL_ATOM_UTF8_EXT, bytes((5,)) + b"hello")) == "hello"
+
+
+def test_floats() -> None:
+    assert etf.py_loads(term(etf.NEW_FLOAT_EXT, pack(">d", 2.5))) == 2.5
+    assert etf.py_loads(term(etf.FLOAT_EXT, b"1.25000000000000000000e+00".ljust(31, b"\x00"))) == 1.25
+
+
+def test_tuples() -> None:
+    small = term(etf.SMALL_TUPLE_EXT, bytes((2, etf.SMALL_INTEGER_EXT, 1, etf.SMALL_INTEGER_EXT, 2)))
+    large = term(etf.LARGE_TUPLE_EXT, pack(">I", 1) + bytes((etf.SMALL_INTEGER_EXT, 7)))
+
+    assert etf.py_loads(small) == [1, 2]
+    assert etf.py_loads(large) == [7]
+
+
+def test_large_big_ext() -> None:
+    value = 2 ** 2100
+    digits = value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+    assert etf.py_loads(term(etf.LARGE_BIG_EXT, pack(">I", len(digits)) + b"\x01" + digits)) == -value
+
+
+def test_compressed() -> None:
+    inner = etf.py_dumps({"t": "READY", "d": {"v": 9}})[1:]
+    payload = term(etf.COMPRESSED, pack(">I", len(inner)) + compress(inner))
+
+    assert etf.py_loads(payload) == {"t": "READY", "d": {"v": 9}}
+
+
+def test_rejects_bad_payloads() -> None:
+    with pytest.raises(etf.ETFError):
+        etf.py_loads(b"\x00")
+    with pytest.raises(etf.ETFError):
+        etf.py_loads(term(1, b""))
+    with pytest.raises(etf.ETFError):
+        etf.py_dumps(object())
+
+
+@pytest.mark.skipif(etf.erlpack is None, reason="erlpack is not installed")
+def test_erlpack_matches_python_decoder() -> None:
+    frame = etf.py_dumps(
+        {
+            "op": 0,
+            "s": 42,
+            "t": "MESSAGE_CREATE",
+            "d": {
+                "id": 881234567890123456,
+                "content": "Hello ☃",
+                "mention_roles": [881234567890123460],
+                "pinned": False,
+                "edited_timestamp": None,
+                "embeds": [],
+            },
+        }
+    )
+
+    assert etf.loads(frame) == etf.py_loads(frame)
+    assert etf.loads(etf.dumps({"content": "hi"})) == {"content": "hi"}
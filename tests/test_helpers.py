@@ -0,0 +1,22 @@
+from corded.helpers import int_types, lazy_types
+
+RAW = {"id": "123", "roles": ["1", "2"], "members": [{"user": {"id": "3"}, "nick": "a"}], "name": "x"}
+
+
+def test_lazy_views_equal_eager_conversion() -> None:
+    view = lazy_types(RAW)
+
+    assert view == int_types(RAW)
+    assert view["roles"] == [1, 2]
+    assert [1, 2] == view["roles"]
+    assert view["members"] == [{"user": {"id": 3}, "nick": "a"}]
+    assert view["roles"] == lazy_types(["1", "2"])
+
+
+def test_lazy_list_inequality() -> None:
+    roles = lazy_types(RAW)["roles"]
+
+    assert roles != [1]
+    assert roles != [1, 3]
+    assert roles != (1, 2)
+    assert not roles != [1, 2]
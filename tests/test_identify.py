@@ -0,0 +1,80 @@
+from asyncio import gather, get_running_loop, run
+
+import pytest
+
+from corded.ws.ratelimiter import IdentifyScheduler
+
+
+def test_buckets_by_shard_id() -> None:
+    async def test() -> None:
+        scheduler = IdentifyScheduler(4, interval=5, loop=get_running_loop())
+        times = [scheduler.reserve(shard_id) for shard_id in range(12)]
+        start = times[0]
+
+        # Each of the 4 buckets identifies one shard at a time, 5 seconds apart
+        for shard_id, at in enumerate(times):
+            assert at - start == pytest.approx(shard_id // 4 * 5, abs=0.05)
+
+    run(test())
+
+
+def test_uneven_buckets() -> None:
+    async def test() -> None:
+        scheduler = IdentifyScheduler(16, interval=5, loop=get_running_loop())
+        start = scheduler.reserve(0)
+
+        # Shards 16 and 32 share bucket 0 with shard 0, shard 17 is first in bucket 1
+        assert scheduler.reserve(16) - start == pytest.approx(5, abs=0.05)
+        assert scheduler.reserve(17) - start == pytest.approx(0, abs=0.05)
+        assert scheduler.reserve(32) - start == pytest.approx(10, abs=0.05)
+
+    run(test())
+
+
+def test_acquire_spacing() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        scheduler = IdentifyScheduler(2, interval=0.05, loop=loop)
+        start = loop.time()
+        times = {}
+
+        async def identify(shard_id: int) -> None:
+            await scheduler.acquire(shard_id)
+            times[shard_id] = loop.time() - start
+
+        await gather(*(identify(shard_id) for shard_id in range(6)))
+
+        for shard_id, at in times.items():
+            assert at == pytest.approx(shard_id // 2 * 0.05, abs=0.02)
+
+        assert scheduler.stats["identified"] == 6
+
+    run(test())
+
+
+def test_budget_exhaustion() -> None:
+    async def test() -> None:
+        scheduler = IdentifyScheduler(16, remaining=2, total=1000, reset_after=100, loop=get_running_loop())
+        start = scheduler.reserve(0)
+
+        assert scheduler.reserve(1) - start == pytest.approx(0, abs=0.05)
+
+        # The third identify waits for the session start budget to reset
+        assert scheduler.reserve(2) - start == pytest.approx(100, abs=0.05)
+        assert scheduler.budget_waits == 1
+        assert scheduler.remaining == 999
+
+    run(test())
+
+
+def test_predict() -> None:
+    async def test() -> None:
+        scheduler = IdentifyScheduler(2, interval=5, loop=get_running_loop())
+
+        assert scheduler.predict([]) == 0
+        assert scheduler.predict(range(8)) == pytest.approx(15, abs=0.05)
+
+        scheduler = IdentifyScheduler(2, remaining=3, total=1000, reset_after=60, loop=get_running_loop())
+        assert scheduler.predict(range(8)) == pytest.approx(60, abs=0.05)
+
+    run(test())
@@ -0,0 +1,110 @@
+from asyncio import gather, get_running_loop, run, sleep, wait_for
+
+import pytest
+
+from corded.objects.constants import GatewayOps
+from corded.ws.outbound import SendQueue
+
+
+class Shard:
+    def __init__(self) -> None:
+        self.written = []
+
+    async def write(self, data: dict) -> None:
+        self.written.append(data)
+
+
+def presence(status: str) -> dict:
+    return {"op": GatewayOps.PRESENCE_UPDATE, "d": {"status": status}}
+
+
+def voice(guild_id: int) -> dict:
+    return {"op": GatewayOps.VOICE_STATE_UPDATE, "d": {"guild_id": guild_id, "channel_id": None}}
+
+
+def test_critical_ops_skip_queue() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        shard = Shard()
+        queue = SendQueue(shard, loop=loop)
+
+        task = loop.create_task(queue.put(presence("idle")))
+        await sleep(0)
+
+        # The session isn't ready, so only heartbeats and identifies go out
+        await wait_for(queue.put({"op": GatewayOps.HEARTBEAT, "d": None}), 0.1)
+        await wait_for(queue.put({"op": GatewayOps.IDENTIFY, "d": {}}), 0.1)
+
+        assert [data["op"] for data in shard.written] == [GatewayOps.HEARTBEAT, GatewayOps.IDENTIFY]
+        assert not task.done()
+
+        queue.open()
+        await wait_for(task, 0.1)
+
+        assert shard.written[-1] == presence("idle")
+        assert queue.stats["critical"] == 2
+
+    run(test())
+
+
+def test_reserved_budget() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        shard = Shard()
+        queue = SendQueue(shard, rate=3, reserved=1, loop=loop)
+        queue.open()
+
+        await queue.put(voice(1))
+        await queue.put(voice(2))
+
+        # Other payloads have used everything but the reserved send, which a heartbeat can still use
+        task = loop.create_task(queue.put(voice(3)))
+        await sleep(0.01)
+        assert not task.done()
+
+        await wait_for(queue.put({"op": GatewayOps.HEARTBEAT, "d": None}), 0.1)
+        assert shard.written[-1]["op"] == GatewayOps.HEARTBEAT
+
+        queue.close()
+        with pytest.raises(ConnectionError):
+            await task
+
+    run(test())
+
+
+def test_presence_coalescing() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        shard = Shard()
+        queue = SendQueue(shard, loop=loop)
+
+        payloads = [presence("idle"), presence("dnd"), voice(1), voice(2), voice(1), presence("online")]
+        tasks = [loop.create_task(queue.put(payload)) for payload in payloads]
+        await sleep(0)
+
+        queue.open()
+        await wait_for(gather(*tasks), 0.1)
+
+        # Only the newest presence and the newest voice state per guild are sent, in priority order
+        assert shard.written == [voice(1), voice(2), presence("online")]
+        assert queue.stats["coalesced"] == 3
+
+    run(test())
+
+
+def test_priority_order() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        shard = Shard()
+        queue = SendQueue(shard, loop=loop)
+        members = {"op": GatewayOps.REQUEST_GUILD_MEMBERS, "d": {"guild_id": 1}}
+
+        tasks = [loop.create_task(queue.put(payload)) for payload in (presence("idle"), members, voice(1))]
+        await sleep(0)
+
+        queue.open()
+        await wait_for(gather(*tasks), 0.1)
+
+        assert shard.written == [voice(1), members, presence("idle")]
+
+    run(test())
@@ -0,0 +1,142 @@
+from asyncio import get_running_loop, run
+from socket import socket
+
+from aiohttp import ClientSession, web
+
+from corded import HTTPClient, Route
+from corded.errors import HTTPError, NotFound
+from corded.http import RatelimitProxy
+
+TOKEN = "token"
+
+
+def free_port() -> int:
+    with socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def upstream(handler, port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    return runner
+
+
+async def run_proxy(handler, test) -> list:
+    """Run a fake upstream and a proxy in front of it, and call test with the proxy's URL."""
+
+    seen = []
+    upstream_port, proxy_port = free_port(), free_port()
+
+    async def record(request: web.Request) -> web.Response:
+        seen.append(request)
+        return await handler(request)
+
+    runner = await upstream(record, upstream_port)
+    proxy = RatelimitProxy(TOKEN, port=proxy_port, url=f"http://127.0.0.1:{upstream_port}", loop=get_running_loop())
+    await proxy.start()
+
+    try:
+        await test(f"http://127.0.0.1:{proxy_port}")
+    finally:
+        await proxy.close()
+        await runner.cleanup()
+
+    return seen
+
+
+def test_forwards_success() -> None:
+    async def handler(request: web.Request) -> web.Response:
+        body = await request.json()
+        return web.json_response(
+            {"id": "1", "content": body["content"]},
+            headers={"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "1"},
+        )
+
+    async def test(url: str) -> None:
+        http = HTTPClient(TOKEN, proxy=url, loop=get_running_loop())
+        try:
+            route = Route("/channels/{channel_id}/messages", channel_id=123)
+            assert await http.post(route, json={"content": "hello"}, reason="audit") == {"id": "1", "content": "hello"}
+        finally:
+            await http.close()
+
+    seen = run(run_proxy(handler, test))
+
+    assert len(seen) == 1
+    assert seen[0].path == "/channels/123/messages"
+    assert seen[0].headers["Authorization"] == f"Bot {TOKEN}"
+    assert seen[0].headers["X-Audit-Log-Reason"] == "audit"
+
+
+def test_passes_errors_through() -> None:
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response({"message": "Unknown Channel", "code": 10003}, status=404)
+
+    async def test(url: str) -> None:
+        http = HTTPClient(TOKEN, proxy=url, loop=get_running_loop())
+        try:
+            await http.get(Route("/channels/{channel_id}", channel_id=123))
+        except NotFound as e:
+            assert e.status == 404
+            assert e.code == 10003
+            assert e.data["message"] == "Unknown Channel"
+        else:
+            raise AssertionError("NotFound was not raised")
+        finally:
+            await http.close()
+
+    seen = run(run_proxy(handler, test))
+
+    # Client errors aren't retried, by the client or the proxy
+    assert len(seen) == 1
+
+
+def test_rejects_other_tokens() -> None:
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def test(url: str) -> None:
+        async with ClientSession() as session:
+            for headers in ({"Authorization": "Bot other"}, {}):
+                async with session.get(f"{url}/users/@me", headers=headers) as response:
+                    assert response.status == 401
+
+    seen = run(run_proxy(handler, test))
+
+    assert not seen
+
+
+def test_proxy_owns_retries() -> None:
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response(
+            {"message": "You are being rate limited.", "retry_after": 0.01, "global": True},
+            status=429,
+            headers={"Via": "1.1 google"},
+        )
+
+    async def test(url: str) -> None:
+        http = HTTPClient(TOKEN, proxy=url, loop=get_running_loop())
+        assert http.ratelimiter.global_limiter is None
+
+        try:
+            await http.get(Route("/users/@me"))
+        except HTTPError as e:
+            assert e.status == 429
+        else:
+            raise AssertionError("HTTPError was not raised")
+        finally:
+            await http.close()
+
+        # The proxy locked its own global limit, the client's is left alone
+        assert http.ratelimiter.global_lock.is_set()
+
+    seen = run(run_proxy(handler, test))
+
+    # Only the proxy retried, the client made a single attempt through it
+    assert len(seen) == 3
@@ -0,0 +1,117 @@
+from asyncio import get_running_loop, run, sleep
+
+from corded.http.ratelimiter import Ratelimiter
+
+
+async def hold(ratelimiter: Ratelimiter, bucket: str, running: list, peak: list, **state) -> None:
+    await ratelimiter.acquire(bucket)
+
+    running.append(None)
+    peak.append(len(running))
+
+    await sleep(0.01)
+
+    running.pop()
+    ratelimiter.release(bucket, **state)
+
+
+def test_unknown_bucket_is_serial() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        ratelimiter = Ratelimiter(loop, global_rate=None)
+        running, peak = [], []
+
+        tasks = [loop.create_task(hold(ratelimiter, "b", running, peak)) for _ in range(5)]
+        for task in tasks:
+            await task
+
+        # Without a known limit there's no way to tell how many requests are safe, so they go one at a time
+        assert len(peak) == 5
+        assert max(peak) == 1
+
+    run(test())
+
+
+def test_known_bucket_allows_remaining() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        ratelimiter = Ratelimiter(loop, global_rate=None)
+
+        await ratelimiter.acquire("b")
+        ratelimiter.release("b", limit=5, remaining=4, reset_after=10)
+
+        acquired = []
+
+        async def request() -> None:
+            await ratelimiter.acquire("b")
+            acquired.append(None)
+
+        tasks = [loop.create_task(request()) for _ in range(10)]
+        await sleep(0.05)
+
+        # Only the reported remaining requests run at once, the rest wait for the reset
+        assert len(acquired) == 4
+        assert len(ratelimiter.buckets["b"].waiters) == 6
+
+        for task in tasks:
+            task.cancel()
+
+    run(test())
+
+
+def test_exhausted_bucket_waits_for_reset() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        ratelimiter = Ratelimiter(loop, global_rate=None)
+
+        await ratelimiter.acquire("b")
+        ratelimiter.release("b", limit=2, remaining=0, reset_after=0.1)
+
+        start = loop.time()
+        await ratelimiter.acquire("b")
+        await ratelimiter.acquire("b")
+
+        # Both requests are let through together once the window resets
+        assert 0.09 <= loop.time() - start < 0.2
+
+    run(test())
+
+
+def test_global_pacing() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        ratelimiter = Ratelimiter(loop)
+
+        start = loop.time()
+        for i in range(50):
+            await ratelimiter.acquire(f"b{i}")
+
+        # A full second's allowance goes out at once, after that requests are paced at 50/s
+        assert loop.time() - start < 0.05
+
+        for i in range(50, 60):
+            await ratelimiter.acquire(f"b{i}")
+
+        assert 0.18 <= loop.time() - start < 0.3
+
+    run(test())
+
+
+def test_interactions_skip_global_limit() -> None:
+    async def test() -> None:
+        loop = get_running_loop()
+        ratelimiter = Ratelimiter(loop)
+
+        for i in range(50):
+            await ratelimiter.acquire(f"b{i}")
+
+        ratelimiter.lock_globally(10)
+
+        start = loop.time()
+        for i in range(100):
+            await ratelimiter.acquire(f"i{i}", interaction=True)
+
+        assert loop.time() - start < 0.05
+        assert ratelimiter.global_limiter.tokens < 1
+
+    run(test())
@@ -0,0 +1,43 @@
+from string import Formatter
+
+import pytest
+
+from corded import Route
+
+
+def route(path: str) -> Route:
+    return Route(path, **{name: "1" for _, name, _, _ in Formatter().parse(path) if name})
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/interactions/{interaction_id}/{interaction_token}/callback",
+        "/webhooks/{application_id}/{interaction_token}",
+        "/webhooks/{application_id}/{interaction_token}/messages/@original",
+        "/webhooks/{application_id}/{interaction_token}/messages/{message_id}",
+    ],
+)
+def test_interaction_routes(path: str) -> None:
+    assert route(path).interaction
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/channels/{channel_id}/messages",
+        "/webhooks/{webhook_id}/{webhook_token}",
+        "/applications/{application_id}/commands",
+    ],
+)
+def test_other_routes(path: str) -> None:
+    assert not route(path).interaction
+
+
+def test_bucket_keys() -> None:
+    a = Route("/channels/{channel_id}/messages", channel_id=1)
+    b = Route("/channels/{channel_id}/messages", channel_id=2)
+
+    assert a.route == "/channels/1/messages"
+    assert a.bucket != b.bucket
+    assert Route("/channels/{channel_id}/messages", channel_id=1).bucket == a.bucket
@@ -0,0 +1,95 @@
+from asyncio import new_event_loop
+from types import SimpleNamespace
+
+import pytest
+
+from corded.objects.constants import GatewayCloseCodes, GatewayOps
+from corded.ws.reconnect import ReconnectCoordinator
+from corded.ws.shard import Shard
+
+
+class Parent:
+    shard_count = 1
+
+    def wants(self, *args) -> bool:
+        return False
+
+
+class WebSocket:
+    def __init__(self) -> None:
+        self.closed = False
+        self.close_code = None
+        self.sent = []
+
+    async def close(self, code: int) -> None:
+        self.closed = True
+        self.close_code = code
+
+    async def send_bytes(self, data) -> None:
+        self.sent.append(data)
+
+    async def send_str(self, data) -> None:
+        self.sent.append(data)
+
+
+@pytest.fixture
+def shard():
+    loop = new_event_loop()
+    shard = Shard(0, Parent(), loop)
+    shard.ws = WebSocket()
+    shard.session = "abc"
+    shard.resume_url = "wss://resume.discord.gg"
+    shard.ws_seq = 42
+
+    yield shard
+
+    loop.close()
+
+
+@pytest.mark.parametrize("resumable", [True, False])
+def test_invalid_session_closes(shard, resumable: bool) -> None:
+    shard.loop.run_until_complete(shard.dispatch({"op": GatewayOps.INVALID_SESSION, "d": resumable}))
+
+    # The reader never waits or sends RESUME itself, connect reconnects and HELLO decides
+    assert shard.ws.closed
+    assert shard.ws.close_code == 4000
+    assert not shard.ws.sent
+    assert (shard.session_state() is not None) is resumable
+
+
+def test_refetches_url_after_rate_limited_close() -> None:
+    loop = new_event_loop()
+    urls = iter(["wss://first", "wss://second"])
+    fetched = []
+
+    class HTTP:
+        async def get_gateway(self):
+            fetched.append(None)
+            return SimpleNamespace(url=next(urls))
+
+    class FakeShard(Shard):
+        connected = []
+
+        async def spawn_ws(self) -> None:
+            self.connected.append(self.url)
+            self.ws = WebSocket()
+
+        async def start_reader(self) -> None:
+            if len(self.connected) == 1:
+                return await self.handle_disconnect(GatewayCloseCodes.RATE_LIMITED)
+            self.stopped = True
+
+    parent = Parent()
+    parent.http = HTTP()
+    parent.identify_limiter = None
+    parent.reconnects = ReconnectCoordinator(base=0.01, loop=loop)
+
+    shard = FakeShard(0, parent, loop)
+
+    try:
+        loop.run_until_complete(shard.connect())
+    finally:
+        loop.close()
+
+    assert len(fetched) == 2
+    assert shard.connected == ["wss://first", "wss://second"]
@@ -0,0 +1,56 @@
+from asyncio import new_event_loop
+from json import dumps
+from zlib import Z_SYNC_FLUSH, compressobj, decompressobj
+
+import pytest
+
+from corded.ws.shard import Shard, ZLIB_SUFFIX
+
+
+@pytest.fixture
+def shard():
+    loop = new_event_loop()
+    shard = Shard(0, None, loop)
+    shard.inflator = decompressobj()
+
+    yield shard
+
+    loop.close()
+
+
+def frame(compressor, message: dict) -> bytes:
+    return compressor.compress(dumps(message).encode()) + compressor.flush(Z_SYNC_FLUSH)
+
+
+def test_messages_end_with_sync_flush_suffix() -> None:
+    assert frame(compressobj(), {"op": 10}).endswith(ZLIB_SUFFIX)
+
+
+def test_whole_frames(shard) -> None:
+    compressor = compressobj()
+
+    # Every message shares the one zlib context for the connection
+    for i in range(3):
+        assert shard.inflate(frame(compressor, {"op": 0, "s": i})) == dumps({"op": 0, "s": i}).encode()
+
+
+def test_message_split_across_frames(shard) -> None:
+    compressor = compressobj()
+    data = frame(compressor, {"op": 0, "d": "x" * 5000})
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+
+    for chunk in chunks[:-1]:
+        assert shard.inflate(chunk) is None
+    assert shard.inflate(chunks[-1]) == dumps({"op": 0, "d": "x" * 5000}).encode()
+
+    # The buffer is cleared, so the next whole message still decodes
+    assert shard.inflate(frame(compressor, {"op": 11})) == dumps({"op": 11}).encode()
+
+
+def test_split_suffix(shard) -> None:
+    compressor = compressobj()
+    data = frame(compressor, {"op": 1})
+
+    # A frame ending part way through the suffix isn't a complete message
+    assert shard.inflate(data[:-2]) is None
+    assert shard.inflate(data[-2:]) == dumps({"op": 1}).encode()